@@ -0,0 +1,153 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Cohort mode: turns a directory of saved schedules into one calendar per student.
+
+Each student is either a snapshot archive (``alice.zip``, as written by
+``--record``) or a folder of saved Weekly Schedule pages (``bob/*.html``). Every
+student runs parse -> dedup -> saved conflict rules -> ICS/CSV export in its own
+worker process, so a cohort scales with the number of cores and one bad input
+only fails that student.
+"""
+
+import glob
+import json
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from sutd_events import dedupe_events, resolve_conflicts
+from sutd_grid_parser import parse_schedule_pages
+from sutd_snapshots import load_snapshot, parse_snapshot_weeks
+
+REPORT_NAME = "batch_report.json"
+
+
+def find_students(input_dir: str) -> List[Tuple[str, str]]:
+    """Returns [(student_id, path), ...] for every snapshot archive or folder of pages in input_dir."""
+    students = []
+    for entry in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, entry)
+        if entry.lower().endswith(".zip") and os.path.isfile(path):
+            students.append((os.path.splitext(entry)[0], path))
+        elif os.path.isdir(path) and glob.glob(os.path.join(path, "*.htm*")):
+            students.append((entry, path))
+    return students
+
+
+def load_rules(path: Optional[str]) -> Dict[str, str]:
+    """Reads conflict rules from a JSON file: either a bot config (its 'conflict_rules') or a bare {rule: keep} map."""
+    if not path:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get("conflict_rules", data) if isinstance(data, dict) else {}
+
+
+def _read_student(path: str):
+    if os.path.isdir(path):
+        pages = []
+        for page in sorted(glob.glob(os.path.join(path, "*.htm*"))):
+            with open(page, 'r', encoding='utf-8') as f:
+                pages.append(f.read())
+        weeks = len(pages)
+        _, events = parse_schedule_pages(pages)
+    else:
+        recorded = load_snapshot(path)
+        weeks = len(recorded)
+        _, events = parse_snapshot_weeks(recorded)
+    return weeks, events
+
+
+def _init_worker():
+    """Pool initializer: logs straight to the log file.
+
+    A forked worker inherits the parent's queue handler but not the listener thread that drains it,
+    so its records would never be written.
+    """
+    from sutd_calendar_bot import log_file_handler
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(logging.INFO)
+    root.addHandler(log_file_handler())
+
+
+def process_student(student: str, path: str, output_dir: str, rules: Dict[str, str],
+                    reminder_minutes: int = 15, recurring: bool = False) -> Dict:
+    """Runs one student's full pipeline. Never raises: failures are returned in the result."""
+    start = time.perf_counter()
+    result = {'student': student, 'path': path, 'status': 'ok', 'weeks': 0, 'sessions': 0,
+              'clashes': 0, 'unresolved': 0, 'error': None}
+    try:
+        # Imported here so the parent process only pays for it if it also exports
+        from sutd_calendar_bot import SUTDCalendarBot
+
+        weeks, events = _read_student(path)
+        events = dedupe_events(events)
+        events, stats = resolve_conflicts(events, dict(rules))
+        if not events:
+            raise ValueError("no class sessions found")
+
+        student_dir = os.path.join(output_dir, student)
+        os.makedirs(student_dir, exist_ok=True)
+        bot = SUTDCalendarBot(log_callback=lambda message: None, perf_log=None)
+        bot.generate_outputs(events, reminder_minutes=reminder_minutes, output_dir=student_dir, recurring=recurring)
+
+        result.update(weeks=weeks, sessions=len(events), clashes=stats['clashes'], unresolved=stats['unresolved'])
+    except Exception as e:
+        result.update(status='failed', error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(input_dir: str, output_dir: str, rules_path: Optional[str] = None, workers: Optional[int] = None,
+              reminder_minutes: int = 15, recurring: bool = False) -> List[Dict]:
+    """Processes every student in input_dir on a process pool and prints a throughput summary."""
+    students = find_students(input_dir)
+    if not students:
+        raise FileNotFoundError(f"No student snapshots (*.zip or folders of .html pages) in {input_dir}")
+    rules = load_rules(rules_path)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"Processing {len(students)} students on {workers} worker processes...")
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(process_student, student, path, output_dir, rules, reminder_minutes, recurring): (student, path)
+            for student, path in students
+        }
+        for future in as_completed(futures):
+            student, path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. out of memory); the pool keeps going for everyone else
+                result = {'student': student, 'path': path, 'status': 'failed', 'error': f"{type(e).__name__}: {e}",
+                          'weeks': 0, 'sessions': 0, 'clashes': 0, 'unresolved': 0, 'seconds': 0.0}
+            results.append(result)
+            if result['status'] != 'ok':
+                print(f"  FAILED {student}: {result['error']}")
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda r: r['student'])
+    failed = [r for r in results if r['status'] != 'ok']
+    unresolved = sum(1 for r in results if r.get('unresolved'))
+    print(f"{len(results) - len(failed)}/{len(results)} students exported in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.1f} students/s, {workers} workers).")
+    if unresolved:
+        print(f"{unresolved} students have clashes with no saved rule (both classes kept).")
+
+    with open(os.path.join(output_dir, REPORT_NAME), 'w', encoding='utf-8') as f:
+        json.dump({'seconds': elapsed, 'workers': workers, 'students_per_second': len(results) / elapsed,
+                   'results': results}, f, indent=1)
+    return results
@@ -17,18 +17,24 @@ import importlib.util
 REQUIRED_PACKAGES = {
     "selenium": "selenium>=4.0.0",
     "customtkinter": "customtkinter>=5.2.0",
-    "ics": "ics>=0.7",
-    "arrow": "arrow",
     "requests": "requests>=2.31.0",
-    "urllib3": "urllib3==1.26.18" # Specific version for stability
+    "urllib3": "urllib3==1.26.18", # Specific version for stability
+    "lxml": "lxml",
+    "tzdata": "tzdata" # IANA zones for zoneinfo on Windows
 }
+# What every mode imports, including the offline ones (--replay, --batch, --query, ...)
+HEADLESS_PACKAGES = ("lxml", "tzdata")
+# What a scrape needs on top of those (the GUI adds customtkinter)
+SCRAPE_PACKAGES = ("selenium", "requests")
 
-def check_and_install_dependencies():
-    """Checks if required packages are installed. If not, installs them."""
+def check_and_install_dependencies(packages=REQUIRED_PACKAGES):
+    """Checks if the given required packages are installed. If not, installs them."""
+    if getattr(sys, 'frozen', False):
+        return  # A frozen build already bundles everything it needs
     missing = []
-    for package_name, install_name in REQUIRED_PACKAGES.items():
+    for package_name in packages:
         if importlib.util.find_spec(package_name) is None:
-            missing.append(install_name)
+            missing.append(REQUIRED_PACKAGES[package_name])
     
     if missing:
         print("==================================================")
@@ -66,78 +72,217 @@ def check_and_install_dependencies():
             input("Press Enter to exit...")
             sys.exit(1)
 
-# Run the check immediately
-check_and_install_dependencies()
+# Only what this module imports is checked up front. Selenium and the GUI toolkit
+# are checked by main() just before the GUI or a scrape needs them, so offline
+# modes never pip-install or restart.
+check_and_install_dependencies(HEADLESS_PACKAGES)
 
 # --- PART 2: MAIN APPLICATION ---
 # Now that dependencies are guaranteed, we can import them safely.
+# Selenium and the GUI toolkit are imported where they are first needed, so
+# offline modes (--replay, --benchmark) start without loading either.
 
-import re
+import bisect
 import json
 import csv
-import arrow
-import threading
+import argparse
 import logging
-import requests
-import customtkinter as ctk
-from tkinter import messagebox
+import logging.handlers
+import queue
+import atexit
 from datetime import date, timedelta, datetime, time as dt_time
-from typing import List, Dict, Optional, Tuple
-
-# Selenium Imports
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException, SessionNotCreatedException
-
-# ICS Library Imports
-from ics import Calendar, Event
-from ics.alarm import DisplayAlarm
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    import threading
+    from selenium import webdriver
+    from selenium.webdriver.support.ui import WebDriverWait
+
+# Selenium-free grid parsing (works on page_source snapshots)
+from sutd_grid_parser import DAY_NAMES, TIME_RANGE_RE, WEEK_OF_RE, parse_cell_text, parse_week_html, build_courses_summary, cell_cache_stats
+from sutd_events import CSV_FIELDS, TIMEZONE, TYPE_MAPPING, ClassEvent, group_weekly_series, ics_entry, WEEKDAY_ABBR
+from sutd_snapshots import SnapshotRecorder, replay_snapshot, run_benchmark
+from sutd_startup import DEFAULT_STARTUP_BUDGET_MS, run_startup_benchmark
+from sutd_perf import PerfRecorder, timed
+from sutd_ics import ExportManifest, ICSWriter, format_utc, get_timezone, stable_uid
+from sutd_http_fetch import REFRESH_ACTION, START_DATE_FIELD, WeekFetcher, format_ps_date
+from sutd_checkpoint import ScrapeCheckpoint
+from sutd_term import DEFAULT_MAX_EMPTY_WEEKS, EmptyWeekTracker, load_recess_weeks, plan_weeks, week_monday
 
 
 # --- LOGGING CONFIGURATION ---
-def get_log_path():
+def get_app_dir():
     if getattr(sys, 'frozen', False):
-        base_dir = os.path.dirname(sys.executable)
-    else:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(base_dir, 'sutd_bot.log')
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+def get_log_path():
+    return os.path.join(get_app_dir(), 'sutd_bot.log')
 
-logging.basicConfig(
-    filename=get_log_path(),
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+PERF_LOG = os.path.join(get_app_dir(), 'sutd_bot_perf.jsonl')  # One JSON record per timed phase
+
+def log_file_handler() -> logging.FileHandler:
+    file_handler = logging.FileHandler(get_log_path(), encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+    return file_handler
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Routes log records through a queue so the scraping thread never waits on file I/O; a listener thread writes the file.
+
+    Called by main() only: a process that merely imports this module (e.g. a --batch pool worker)
+    would have the queue but not the listener thread that drains it.
+    """
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, log_file_handler())
+    listener.start()
+    atexit.register(listener.stop)  # Flushes whatever is still queued
+    return listener
 
 # --- CONFIGURATION ---
 DESKTOP_PATH = os.path.join(os.path.expanduser("~"), "Desktop")
 OUTPUT_ICS = os.path.join(DESKTOP_PATH, "SUTD_Calendar.ics")
 OUTPUT_CSV = os.path.join(DESKTOP_PATH, "SUTD_Schedule.csv")
+OUTPUT_DELTA_ICS = os.path.join(DESKTOP_PATH, "SUTD_Calendar_Changes.ics")  # Only what changed since the last export
+EXPORT_MANIFEST = os.path.join(DESKTOP_PATH, "SUTD_Calendar.manifest.json")
 CONFIG_FILE = "sutd_bot_config.json"
-TIMEZONE = "Asia/Singapore"
-
-# UI THEME
-ctk.set_appearance_mode("System")  
-ctk.set_default_color_theme("blue") 
-
-# TYPE MAPPING
-TYPE_MAPPING = {
-    "CBL": "Cohort Class",
-    "LEC": "Lecture",
-    "LAB": "Lab",
-    "TUT": "Tutorial",
-    "REC": "Recitation",
-    "TES": "Test/Exam"
+ACADEMIC_CALENDAR_FILE = os.path.join(get_app_dir(), "sutd_academic_calendar.json")  # Optional list of recess weeks
+CHECKPOINT_FILE = os.path.join(get_app_dir(), "sutd_bot_checkpoint.jsonl")  # Weeks scraped so far, for resuming a crashed run
+STORE_FILE = os.path.join(get_app_dir(), "sutd_bot_events.db")  # Default SQLite session store for --store / --query
+
+# LOGIN
+PORTAL_URL = "https://ease.sutd.edu.sg/app/sutd_myportal_1/exk3pseb8o4VxzQF85d7/sso/saml"
+PROFILE_DIR = os.path.join(get_app_dir(), "sutd_bot_profile")      # Persistent Chrome profile ("Remember login")
+COOKIE_FILE = os.path.join(get_app_dir(), "sutd_bot_cookies.json")  # Portal cookies, for browsers without profiles
+LOGIN_TIMEOUT = 120       # Time allowed for manual SSO + 2FA (seconds)
+SESSION_CHECK_TIMEOUT = 8 # How long a remembered session gets to land on the portal before asking for a login
+
+# GRID PARSING
+# Runs inside the schedule iframe and returns everything one week needs in a single round-trip.
+# Cells are pre-filtered on the same time pattern as TIME_RANGE_RE so the payload stays small.
+GRID_EXTRACT_JS = """
+const days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'];
+const timeRe = /\\d{1,2}:\\d{2}[AP]M\\s*-\\s*\\d{1,2}:\\d{2}[AP]M/;
+const weekMatch = /Week of\\s*(\\d{1,2}\\/\\d{1,2}\\/\\d{4})/.exec(document.body.innerText);
+const headers = [];
+let left = Infinity, right = -Infinity;
+for (const th of document.querySelectorAll('th')) {
+    const text = th.innerText || '';
+    if (days.some(d => text.includes(d))) {
+        const r = th.getBoundingClientRect();
+        headers.push({x: r.left + window.scrollX, width: r.width});
+        left = Math.min(left, r.left + window.scrollX);
+        right = Math.max(right, r.right + window.scrollX);
+    }
+}
+const cells = [];
+for (const td of document.querySelectorAll('td')) {
+    const text = td.innerText || '';
+    if (!timeRe.test(text)) continue;
+    const r = td.getBoundingClientRect();
+    cells.push({text: text, x: r.left + window.scrollX, width: r.width});
+}
+return {week: weekMatch ? weekMatch[1] : null, headers: headers, cells: cells,
+        checksum: [headers.length, Math.round(left), Math.round(right)]};
+"""
+
+# The same header count + grid extent as GRID_EXTRACT_JS, for checking cached day columns in legacy mode.
+HEADER_CHECKSUM_JS = """
+const days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'];
+let count = 0, left = Infinity, right = -Infinity;
+for (const th of document.querySelectorAll('th')) {
+    const text = th.innerText || '';
+    if (!days.some(d => text.includes(d))) continue;
+    const r = th.getBoundingClientRect();
+    count += 1;
+    left = Math.min(left, r.left + window.scrollX);
+    right = Math.max(right, r.right + window.scrollX);
 }
+return [count, Math.round(left), Math.round(right)];
+"""
+
+# Polled while waiting for PeopleSoft AJAX: the processing indicator (WAIT_win0) plus the current "Week of" label.
+PAGE_STATE_JS = """
+const indicator = document.getElementById('WAIT_win0');
+const busy = !!indicator && indicator.offsetParent !== null && getComputedStyle(indicator).visibility !== 'hidden';
+const weekMatch = /Week of\\s*(\\d{1,2}\\/\\d{1,2}\\/\\d{4})/.exec(document.body ? document.body.innerText : '');
+return {idle: document.readyState === 'complete' && !busy, week: weekMatch ? weekMatch[1] : null};
+"""
+# The logged-in student as shown on the schedule component, so a checkpoint is only resumed by the same person.
+USER_JS = """
+const field = document.getElementById('DERIVED_SSTSNAV_PERSON_NAME');
+return field ? field.innerText.trim() || null : null;
+"""
+USER_COOKIE = "SignOnDefault"  # PeopleSoft's remembered user ID, used when the page shows no name
+AJAX_TIMEOUT = 20       # Upper bound for a single PeopleSoft round-trip (seconds)
+STALE_GRACE = 0.5       # Longest wait for a click to show any effect (the old fixed sleep); PeopleSoft sometimes updates in place
+MAX_WEEKS = 16          # Standard term + recess, and a guard against paging forever
+WEEK_RETRIES = 2        # Extra attempts for a week whose navigation or extraction failed
+MAX_FAILED_WEEKS = 2    # Consecutive failed weeks before the scan is abandoned (the checkpoint keeps the weeks loaded so far)
+
+class DayColumns:
+    """Day column boundaries of the schedule grid, measured once and reused while the layout is unchanged.
+
+    A cell belongs to the day whose header centre is nearest to its own centre; with the centres
+    sorted, that is a bisect over the midpoints between neighbouring centres.
+    """
+
+    def __init__(self, centres: List[float], checksum: Optional[Tuple]):
+        self.count = len(centres)
+        self.boundaries = [(a + b) / 2 for a, b in zip(centres, centres[1:])]
+        self.checksum = checksum  # (header count, grid left, grid right); None means always re-measure
+
+    @classmethod
+    def from_headers(cls, headers: List[Dict], checksum: Optional[Tuple] = None) -> 'DayColumns':
+        """Sorts headers left-to-right and drops duplicates (sometimes hidden elements exist)."""
+        centres = []
+        last_x = None
+        for header in sorted(headers, key=lambda h: h['x']):
+            if last_x is None or abs(header['x'] - last_x) > 10:
+                centres.append(header['x'] + header['width'] / 2)
+                last_x = header['x']
+        return cls(centres, checksum)
+
+    def day_index(self, x: float, width: float) -> int:
+        return bisect.bisect_right(self.boundaries, x + width / 2)
+
+
+# EXPORT
+PROGRESS_EVERY = 200    # Entries written between progress callbacks / cancellation checks
+
+class ExportCancelled(Exception):
+    """Raised by generate_outputs when its cancel event is set. Previously exported files are left untouched."""
 
 class SUTDCalendarBot:
-    def __init__(self, log_callback=None):
-        self.driver: Optional[webdriver.Remote] = None
-        self.wait: Optional[WebDriverWait] = None
+    def __init__(self, log_callback=None, extraction_mode="html", portal_url=PORTAL_URL, remember_login=False, profile_dir=PROFILE_DIR, http_weeks=True, perf_log=PERF_LOG):
+        self.driver: Optional['webdriver.Remote'] = None
+        self.wait: Optional['WebDriverWait'] = None
         self.log_callback = log_callback
+        # "html" (one page_source grab per week, parsed offline), "bulk" (one execute_script per week) or "legacy" (per-element calls)
+        self.extraction_mode = extraction_mode
+        self.command_count = 0
+        self.recorder: Optional[SnapshotRecorder] = None  # Set by --record to save every week's raw HTML
+        self.wait_times: List[Tuple[str, float]] = []  # (step, seconds) for every adaptive wait
+        self.portal_url = portal_url
+        self.remember_login = remember_login  # Reuse a persistent profile + saved cookies to skip SSO when still valid
+        self.profile_dir = profile_dir
+        self.cookie_file = COOKIE_FILE  # Where remembered portal cookies are kept
+        self.http_weeks = http_weeks  # Fetch weeks after the first over HTTP instead of clicking Next Week
+        self.date_range: Tuple[Optional[date], Optional[date]] = (None, None)  # Partial re-sync window
+        self.max_empty_weeks = DEFAULT_MAX_EMPTY_WEEKS
+        self.recess_weeks = load_recess_weeks(ACADEMIC_CALENDAR_FILE)
+        self.perf = PerfRecorder(perf_log)  # Timing spans for every phase of the run
+        self.profile_path: Optional[str] = None  # Set by --profile to cProfile the post-scrape pipeline
+        self.day_columns: Optional[DayColumns] = None  # Grid geometry for bulk/legacy extraction, kept for the session
+        self.checkpoint_path: Optional[str] = CHECKPOINT_FILE  # Per-week scrape checkpoints (None disables resuming)
+        self.store_path: Optional[str] = None  # Set by --store to keep every scraped session in SQLite
+        self.headless = False  # Run Chrome without a window (the scrape benchmark; real logins need one)
+        self.weeks_loaded = 0  # Weeks covered by the last scrape
+        self.user: Optional[str] = None  # Logged-in student, read once the grid is up
 
     def log(self, message):
         logging.info(message) 
@@ -146,25 +291,41 @@ class SUTDCalendarBot:
         else:
             print(message)
 
+    @timed("start_browser")
     def start_browser(self):
+        from selenium import webdriver
+        from selenium.webdriver.support.ui import WebDriverWait
+
         self.log("Starting Browser...")
         
-        try:
-            options = webdriver.ChromeOptions()
-            options.add_experimental_option("detach", True)
-            options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            self.driver = webdriver.Chrome(options=options)
-            self.wait = WebDriverWait(self.driver, 15)
-            self.log("Google Chrome started successfully.")
-            return
-        except Exception as e:
-            logging.warning(f"Chrome failed to start: {e}")
-            self.log("Chrome not found or failed. Checking for alternatives...")
+        profiles = [self.profile_dir, None] if self.remember_login else [None]
+        for profile_dir in profiles:
+            try:
+                options = webdriver.ChromeOptions()
+                options.add_experimental_option("detach", True)
+                options.add_experimental_option('excludeSwitches', ['enable-logging'])
+                if profile_dir:
+                    options.add_argument(f"--user-data-dir={profile_dir}")
+                if self.headless:
+                    options.add_argument("--headless=new")
+                    options.add_argument("--window-size=1400,1000")
+                self.driver = webdriver.Chrome(options=options)
+                self._install_command_counter()
+                self.wait = WebDriverWait(self.driver, 15)
+                self.log("Google Chrome started successfully." + (" (remembered profile)" if profile_dir else ""))
+                return
+            except Exception as e:
+                logging.warning(f"Chrome failed to start (profile={profile_dir}): {e}")
+                if profile_dir:
+                    self.log("Saved browser profile is unavailable (is another bot window open?). Starting a fresh one...")
+                    continue
+                self.log("Chrome not found or failed. Checking for alternatives...")
 
         if sys.platform == "darwin":
             self.log("Attempting to launch Safari...")
             try:
                 self.driver = webdriver.Safari()
+                self._install_command_counter()
                 self.driver.maximize_window()
                 self.wait = WebDriverWait(self.driver, 15)
                 self.log("Safari started successfully.")
@@ -175,21 +336,87 @@ class SUTDCalendarBot:
 
         raise RuntimeError("Could not find Google Chrome. Please install Chrome (or enable Safari automation if on Mac).")
 
+    def _install_command_counter(self):
+        """Wraps driver.execute so every chromedriver round-trip (including WebElement calls) is counted."""
+        original_execute = self.driver.execute
+
+        def counting_execute(driver_command, params=None):
+            self.command_count += 1
+            return original_execute(driver_command, params)
+
+        self.driver.execute = counting_execute
+
+    def _page_state(self) -> Dict:
+        return self.driver.execute_script(PAGE_STATE_JS)
+
+    def _wait_for_ajax(self, step: str, stale_element=None, old_week: Optional[str] = None):
+        """Blocks until PeopleSoft has finished reloading after a click, then records how long that took.
+
+        Any of these signals can be supplied: the clicked/old element going stale, the
+        "Week of" label moving off old_week, and (always) the processing indicator clearing.
+        A stale element means the page has reloaded, so the label is not waited on after that:
+        PeopleSoft may have sent the same week again (e.g. a jump past the end of term).
+        """
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        stale = EC.staleness_of(stale_element) if stale_element is not None else (lambda d: False)
+        start = time.perf_counter()
+        wait = WebDriverWait(self.driver, AJAX_TIMEOUT, poll_frequency=0.1)
+        try:
+            if stale_element is not None:
+                # Right after the click the indicator may not be up yet; give the request a moment to start
+                try:
+                    WebDriverWait(self.driver, STALE_GRACE, poll_frequency=0.1).until(
+                        lambda d: stale(d) or not self._page_state()['idle'])
+                except TimeoutException:
+                    pass
+            if old_week is not None:
+                wait.until(lambda d: stale(d) or self._page_state()['week'] != old_week)
+            wait.until(lambda d: self._page_state()['idle'])
+        except TimeoutException:
+            self.log(f"Warning: '{step}' still loading after {AJAX_TIMEOUT}s, continuing anyway.")
+
+        elapsed = time.perf_counter() - start
+        self.wait_times.append((step, elapsed))
+        self.perf.record("wait", elapsed, step=step)
+        logging.info(f"Waited {elapsed:.2f}s for {step}")
+        return elapsed
+
+    @timed("login")
     def login_and_prepare_grid(self):
         """Logs in and clicks the necessary checkboxes to display Title and Instructors."""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         if not self.driver or not self.wait:
             raise RuntimeError("Browser not started!")
 
+        self.wait_times = []
         try:
+            if self.remember_login:
+                self._restore_cookies()
+
             self.log("Navigating to portal...")
-            self.driver.get("https://ease.sutd.edu.sg/app/sutd_myportal_1/exk3pseb8o4VxzQF85d7/sso/saml")
+            self.driver.get(self.portal_url)
 
-            self.log("Waiting for Manual Login...")
-            self.log("ACTION REQUIRED: Log in & do 2FA in the browser window.")
-            
-            mfa_wait = WebDriverWait(self.driver, 120) 
-            mfa_wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "PSHYPERLINKNOUL"))).click()
-            self.log("Login detected! Proceeding...")
+            portal_link = self._find_portal_link() if self.remember_login else None
+            if portal_link:
+                self.log("Saved login is still valid. Skipping SSO!")
+            else:
+                self.log("Waiting for Manual Login...")
+                self.log("ACTION REQUIRED: Log in & do 2FA in the browser window.")
+
+                mfa_wait = WebDriverWait(self.driver, LOGIN_TIMEOUT)
+                portal_link = mfa_wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "PSHYPERLINKNOUL")))
+                self.log("Login detected! Proceeding...")
+
+            if self.remember_login:
+                self._save_cookies()
+            portal_link.click()
 
             self.wait.until(EC.element_to_be_clickable((By.ID, "ADMN_S20160108140638335703604"))).click()
             self.log("Opened Weekly Schedule...")
@@ -200,13 +427,13 @@ class SUTDCalendarBot:
             title_checkbox = self.wait.until(EC.presence_of_element_located((By.ID, "DERIVED_CLASS_S_SSR_DISP_TITLE")))
             if not title_checkbox.is_selected():
                 title_checkbox.click()
-                time.sleep(0.5) 
+                self._wait_for_ajax("Show Title checkbox", stale_element=title_checkbox)
             
             # 2. Check Instructor Box
             instr_checkbox = self.wait.until(EC.presence_of_element_located((By.ID, "DERIVED_CLASS_S_SHOW_INSTR")))
             if not instr_checkbox.is_selected():
                 instr_checkbox.click()
-                time.sleep(0.5)
+                self._wait_for_ajax("Show Instructors checkbox", stale_element=instr_checkbox)
             
             # 3. Click Refresh Calendar
             self.log("Refreshing Grid Details...")
@@ -214,8 +441,9 @@ class SUTDCalendarBot:
             refresh_btn.click()
             
             # Wait for reload
-            time.sleep(3)
-            self.log("Calendar grid ready for extraction.")
+            waited = self._wait_for_ajax("Refresh Calendar", stale_element=refresh_btn)
+            self.user = self._detect_user()
+            self.log(f"Calendar grid ready for extraction ({waited:.1f}s).")
 
         except TimeoutException:
             raise TimeoutException("Login timed out. Please try again and ensure you complete 2FA.")
@@ -224,632 +452,692 @@ class SUTDCalendarBot:
             self.log(f"Error preparing grid: {e}")
             raise
 
-    def scrape_calendar_grid(self) -> Tuple[List[Dict], List[Dict]]:
-        """Paginates through the weeks, extracts cell data via Visual Geometry & Line Parsing, and returns courses & raw events."""
+    def _detect_user(self) -> Optional[str]:
+        """Returns who is logged in (the name on the schedule page, else PeopleSoft's user ID cookie), or None."""
+        try:
+            user = self.driver.execute_script(USER_JS)
+            if not user:
+                user = (self.driver.get_cookie(USER_COOKIE) or {}).get('value') or None
+            return user
+        except Exception as e:
+            logging.warning(f"Could not tell which student is logged in: {e}")
+            return None
+
+    def _find_portal_link(self):
+        """Returns the portal's landing link if a remembered session gets us past SSO on its own, else None."""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        self.log("Checking for a remembered login...")
+        try:
+            return WebDriverWait(self.driver, SESSION_CHECK_TIMEOUT).until(
+                EC.element_to_be_clickable((By.CLASS_NAME, "PSHYPERLINKNOUL")))
+        except TimeoutException:
+            self.log("Remembered login has expired.")
+            return None
+
+    def _save_cookies(self):
+        """Stores the portal's cookies (and the page they belong to) so the session can be restored next run."""
+        try:
+            payload = {'url': self.driver.current_url, 'cookies': self.driver.get_cookies()}
+            with open(self.cookie_file, 'w') as f:
+                json.dump(payload, f)
+            if os.name == 'posix':
+                os.chmod(self.cookie_file, 0o600)
+        except Exception as e:
+            logging.warning(f"Could not save session cookies: {e}")
+
+    def _restore_cookies(self):
+        """Loads saved cookies into the browser. Cookies can only be set for the current domain, so visit it first."""
+        from selenium.common.exceptions import WebDriverException
+
+        if not os.path.exists(self.cookie_file):
+            return
+        try:
+            with open(self.cookie_file, 'r') as f:
+                payload = json.load(f)
+            # A static file on the same origin avoids being bounced to SSO before the cookies are in place
+            origin = urlsplit(payload['url'])
+            self.driver.get(f"{origin.scheme}://{origin.netloc}/favicon.ico")
+            now = time.time()
+            for cookie in payload['cookies']:
+                if cookie.get('expiry') and cookie['expiry'] < now:
+                    continue
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException:
+                    pass
+        except Exception as e:
+            logging.warning(f"Could not restore session cookies: {e}")
+
+    @timed("scrape")
+    def scrape_calendar_grid(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Tuple[List[Dict], List[ClassEvent]]:
+        """Loads the planned weeks, extracts each with the configured extraction mode, and returns courses & raw events.
+
+        start_date/end_date limit the scrape to a date range (default: self.date_range, else the
+        week on screen onwards). Known recess weeks are skipped and scraping stops after
+        max_empty_weeks consecutive weeks without classes. Every week is checkpointed as soon as
+        it is parsed, so a crashed run picks up at the first week it does not have yet.
+        """
         driver = self.driver
         if driver is None:
             raise RuntimeError("Browser not started!")
+        start_date = start_date or self.date_range[0]
+        end_date = end_date or self.date_range[1]
+
+        # 1. Work out which weeks to load
+        shown_week = self._page_state()['week']
+        current_week = datetime.strptime(shown_week, "%d/%m/%Y").date() if shown_week else None
+        first_week = week_monday(start_date) if start_date else current_week
+        if first_week is None:
+            self.log("Could not detect week start date. Finished scraping.")
+            return [], []
+        # Max 16 weeks to prevent infinite loops (standard term + recess) unless a range was given
+        plan = plan_weeks(first_week, end_date, self.recess_weeks, MAX_WEEKS)
+        skipped = sum(1 for week in plan_weeks(first_week, end_date, set(), MAX_WEEKS) if week not in plan)
+        self.log(f"Planning {len(plan)} weeks from {first_week:%d %b %Y}" + (f" ({skipped} recess weeks skipped)." if skipped else "."))
+
+        # 2. Reuse whatever an interrupted earlier run of this student already saved
+        checkpoint_path = self.checkpoint_path
+        if checkpoint_path and not self.user:
+            self.log("Could not tell which student is logged in, so this scan cannot be resumed if it is interrupted.")
+            checkpoint_path = None
+        checkpoint = ScrapeCheckpoint.load(checkpoint_path, self.portal_url, self.user)
+        restored = sum(1 for week in plan if week in checkpoint)
+        if restored:
+            self.log(f"Resuming: {restored} weeks were saved by an interrupted run, loading only the rest.")
+            if self.recorder:
+                self.log("Note: the snapshot will only contain the weeks loaded in this run.")
 
         all_events = []
-        courses_summary = {}
-
-        # Max 16 weeks to prevent infinite loops (standard term + recess)
-        for week_idx in range(16):
-            self.log(f"Scraping Week {week_idx + 1}...")
-            
-            # 1. Get the current week's starting date
-            body_text = driver.find_element(By.TAG_NAME, "body").text
-            week_match = re.search(r"Week of\s*(\d{1,2}/\d{1,2}/\d{4})", body_text)
-            
-            if week_match:
-                week_start_str = week_match.group(1)
-                week_start_date = arrow.get(week_start_str, ["D/M/YYYY", "DD/MM/YYYY"]).date()
+        empty_weeks = EmptyWeekTracker(self.max_empty_weeks)
+        failed_weeks = []
+        failed_streak = 0
+        http_pending = self.http_weeks  # Direct fetching is tried once, after the first week loaded in the browser
+        http_done = False
+        last_loaded = None  # The last week actually loaded in the browser
+
+        for week_idx, planned_week in enumerate(plan):
+            if planned_week in checkpoint:
+                week_events = checkpoint.weeks[planned_week]
+            elif http_done:
+                break  # The HTTP fetch stopped here because the term is over
             else:
-                self.log("Could not detect week start date. Finished scraping.")
-                break
-
-            # 2. Map Day Headers by X-Coordinate to bypass HTML rowspan issues
-            day_headers = driver.find_elements(By.XPATH, "//th[contains(., 'Monday') or contains(., 'Tuesday') or contains(., 'Wednesday') or contains(., 'Thursday') or contains(., 'Friday') or contains(., 'Saturday') or contains(., 'Sunday')]")
-            
-            day_coords = []
-            for header in day_headers:
-                text = header.text.strip()
-                # Ensure it's actually a day header
-                if any(day in text for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']):
-                    day_coords.append({
-                        'x': header.location['x'],
-                        'width': header.size['width']
-                    })
-            
-            # Sort left-to-right and remove duplicates (sometimes hidden elements exist)
-            day_coords.sort(key=lambda d: d['x'])
-            unique_day_coords = []
-            for dc in day_coords:
-                if not unique_day_coords or abs(dc['x'] - unique_day_coords[-1]['x']) > 10:
-                    unique_day_coords.append(dc)
-
-            if len(unique_day_coords) < 7:
-                self.log(f"Warning: Only found {len(unique_day_coords)} day columns. Grid parsing might be slightly off.")
-
-            # 3. Scan EVERY cell in the table body visually
-            all_tds = driver.find_elements(By.XPATH, "//td")
-            for td in all_tds:
-                cell_text = td.get_attribute("innerText").strip()
-                
-                # Fast filter: Does it contain a time format? If not, skip it.
-                if not re.search(r'\d{1,2}:\d{2}[AP]M\s*-\s*\d{1,2}:\d{2}[AP]M', cell_text):
+                self.log(f"Scraping Week {week_idx + 1} ({planned_week:%d %b})...")
+                commands_before = self.command_count
+
+                # 3. Load the week, retrying it on its own (by date) when navigation or extraction fails
+                outcome = None
+                for attempt in range(WEEK_RETRIES + 1):
+                    try:
+                        outcome = self._scrape_week(week_idx, planned_week, current_week if attempt == 0 else None)
+                        shown = outcome[0]
+                        if shown is not None and week_monday(shown) != week_monday(planned_week):
+                            if shown == last_loaded:
+                                outcome = (None, [], None)  # Past the end of term the portal keeps showing the last week
+                            else:
+                                # e.g. a stale ICStateNum after the HTTP fetch made PeopleSoft re-send another week
+                                raise RuntimeError(f"portal showed the week of {shown:%d %b} instead")
+                        break
+                    except Exception as e:
+                        logging.warning(f"Week {week_idx + 1} attempt {attempt + 1} failed: {e}", exc_info=True)
+                        self.log(f"Week {week_idx + 1} failed ({type(e).__name__}). "
+                                 + ("Retrying..." if attempt < WEEK_RETRIES else "Moving on; it can be retried later."))
+                        current_week = None  # Unknown after a failure, so the retry jumps by date
+                if outcome is None:
+                    failed_weeks.append(planned_week)
+                    failed_streak += 1
+                    if failed_streak >= MAX_FAILED_WEEKS:
+                        # Don't hand back a truncated term: the checkpoint already holds every loaded week for the retry
+                        missing = [week for week in plan if week not in checkpoint]
+                        self.weeks_loaded = len(checkpoint.weeks)
+                        raise RuntimeError(f"{failed_streak} weeks in a row failed to load, so the browser looks unusable. "
+                                           f"{len(missing)} weeks were not loaded: {', '.join(f'{week:%d %b}' for week in missing)}.")
                     continue
+                failed_streak = 0
 
-                # 4. Map cell to date using X-Coordinate geometry
-                cell_center = td.location['x'] + (td.size['width'] / 2)
-                matched_day_idx = 0
-                min_dist = float('inf')
-                
-                for i, day in enumerate(unique_day_coords):
-                    day_center = day['x'] + (day['width'] / 2)
-                    dist = abs(cell_center - day_center)
-                    if dist < min_dist:
-                        min_dist = dist
-                        matched_day_idx = i
-                
-                current_date = week_start_date + timedelta(days=matched_day_idx)
-
-                # 5. Parse cell text Line-by-Line (Safely handling 'Time Conflict')
-                chunks = re.split(r'\bTime Conflict\b', cell_text, flags=re.IGNORECASE)
-                for chunk in chunks:
-                    lines = [line.strip() for line in chunk.split('\n') if line.strip()]
-                    if not lines: continue
-                    
-                    # Find the time line index to anchor our parsing
-                    time_line_idx = -1
-                    for idx, line in enumerate(lines):
-                        if re.search(r'\d{1,2}:\d{2}[AP]M\s*-\s*\d{1,2}:\d{2}[AP]M', line):
-                            time_line_idx = idx
-                            break
-                    
-                    # Ensure we have enough context lines (Code/Section, Type, Time)
-                    if time_line_idx >= 2:
-                        # Extract Code & Section (Line 0)
-                        code_sec_match = re.match(r'(?P<code>\d{2}\s*\.\d{3})\s*-\s*(?P<section>\w+)', lines[0])
-                        if not code_sec_match: continue
-                        
-                        code = code_sec_match.group('code').replace(' ', '')
-                        section = code_sec_match.group('section')
-                        
-                        # Extract Type and Title
-                        ctype = lines[time_line_idx - 1]
-                        title = " ".join(lines[1:time_line_idx - 1]) if time_line_idx > 2 else "Unknown Course"
-                        
-                        # Extract Times
-                        time_str = lines[time_line_idx]
-                        time_match = re.search(r'(?P<start>\d{1,2}:\d{2}[AP]M)\s*-\s*(?P<end>\d{1,2}:\d{2}[AP]M)', time_str)
-                        if not time_match: continue
-                        start_time = time_match.group('start')
-                        end_time = time_match.group('end')
-                        
-                        # Extract Location & Instructors
-                        location = lines[time_line_idx + 1] if time_line_idx + 1 < len(lines) else "Unknown Location"
-                        
-                        instructors_str = " ".join(lines[time_line_idx + 2:])
-                        if "Instructors:" in instructors_str:
-                            instructors_str = instructors_str.replace("Instructors:", "").strip()
-                            instructors_str = ", ".join([i.strip() for i in instructors_str.split(',') if i.strip()])
-                        elif not instructors_str:
-                            instructors_str = "Staff"
-
-                        event = {
-                            'code': code,
-                            'section': section,
-                            'title': title,
-                            'type': ctype,
-                            'date': current_date,
-                            'start_time': start_time,
-                            'end_time': end_time,
-                            'location': location,
-                            'instructors': instructors_str
-                        }
-                        all_events.append(event)
-                        
-                        # Add to UI Summary Dictionary
-                        if code not in courses_summary:
-                            courses_summary[code] = {'code': code, 'name': title, 'type': {}}
-                        if ctype not in courses_summary[code]['type']:
-                            courses_summary[code]['type'][ctype] = True
-
-            # 6. Click Next Week Button
-            try:
-                next_btn = None
-                try:
-                    next_btn = driver.find_element(By.ID, "DERIVED_CLASS_S_SSR_NEXT_WEEK")
-                except:
-                    next_btn = driver.find_element(By.XPATH, "//*[@value='Next Week >>' or @title='Next Week >>']")
-                
-                if not next_btn or not next_btn.is_enabled():
+                week_start_date, week_events, html = outcome
+                if week_start_date is None:
+                    self.log("Reached end of schedule or could not detect the week start date. Finished scraping.")
                     break
-                    
-                next_btn.click()
-                time.sleep(2) # Give PeopleSoft time to reload the grid via AJAX
-                
-            except Exception as e:
-                self.log("Reached end of schedule or 'Next Week' not found.")
+                current_week = last_loaded = week_start_date
+                checkpoint.add_week(planned_week, week_events)
+                if self.recorder:
+                    self.recorder.add_week(week_start_date, html)
+                self.log(f"Week {week_idx + 1}: {self.command_count - commands_before} WebDriver commands ({self.extraction_mode} extraction).")
+
+            all_events.extend(week_events)
+            if empty_weeks.add(len(week_events)):
+                self.log(f"{empty_weeks.streak} weeks in a row without classes. The term is over.")
                 break
 
-        courses_list = list(courses_summary.values())
-        self.log(f"Completed! Found {len(courses_list)} unique courses across {len(all_events)} sessions.")
-        return courses_list, all_events
+            # The browser has done its job once a week is up: fetch the rest directly if we can
+            if http_pending and planned_week not in failed_weeks and week_idx + 1 < len(plan):
+                http_pending = False
+                remaining = [week for week in plan[week_idx + 1:] if week not in checkpoint]
+                if remaining:
+                    http_done = self._fetch_weeks_over_http(remaining, empty_weeks, checkpoint)
+
+        # 4. Keep the checkpoint until every planned week made it, so the next run only retries the gaps
+        self.weeks_loaded = len(checkpoint.weeks)
+        self.save_to_store(checkpoint.weeks)
+        if failed_weeks:
+            self.log(f"Could not load {len(failed_weeks)} weeks ({', '.join(f'{week:%d %b}' for week in failed_weeks)}). "
+                     "Run the scan again to fetch just those; everything else is saved.")
+        else:
+            checkpoint.clear()
 
-    def generate_outputs(self, events: List[Dict], reminder_minutes: int = 15):
-        if not events:
-            self.log("No events to write.")
-            return
+        if start_date or end_date:
+            all_events = [ev for ev in all_events
+                          if (not start_date or ev.date >= start_date) and (not end_date or ev.date <= end_date)]
 
-        self.log(f"Writing ICS and CSV files to Desktop...")
-        cal = Calendar()
-        
-        # Prepare CSV configuration
-        csv_keys = ["Date", "Course Code", "Section", "Title", "Type", "Start Time", "End Time", "Location", "Instructors"]
-        csv_data = []
-        
-        for ev in events:
-            # Add to CSV row list
-            csv_data.append({
-                "Date": ev['date'].strftime('%Y-%m-%d'),
-                "Course Code": ev['code'],
-                "Section": ev['section'],
-                "Title": ev['title'],
-                "Type": ev['type'],
-                "Start Time": ev['start_time'],
-                "End Time": ev['end_time'],
-                "Location": ev['location'],
-                "Instructors": ev['instructors']
-            })
-
-            # Add to ICS Event
-            e = Event()
-            friendly_type = TYPE_MAPPING.get(ev['type'], ev['type'])
-            e.name = f"{ev['title']} ({friendly_type})"
-            
-            start_str = f"{ev['date'].isoformat()} {ev['start_time']}"
-            end_str = f"{ev['date'].isoformat()} {ev['end_time']}"
-            
-            e.begin = arrow.get(start_str, ['YYYY-MM-DD h:mmA', 'YYYY-MM-DD H:mm']).replace(tzinfo=TIMEZONE)
-            e.end = arrow.get(end_str, ['YYYY-MM-DD h:mmA', 'YYYY-MM-DD H:mm']).replace(tzinfo=TIMEZONE)
-            e.location = ev['location']
-            e.description = f"Course: {ev['code']} {ev['section']}\nInstructors: {ev['instructors']}"
-            
-            if reminder_minutes > 0:
-                e.alarms.append(DisplayAlarm(trigger=timedelta(minutes=-reminder_minutes)))
+        total_wait = sum(t for _, t in self.wait_times)
+        slowest = max(self.wait_times, key=lambda w: w[1], default=None)
+        if slowest:
+            self.log(f"Page loads: {total_wait:.1f}s total across {len(self.wait_times)} waits (slowest: {slowest[0]}, {slowest[1]:.1f}s).")
+
+        stats = cell_cache_stats()
+        self.log(f"Cell parser cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate).")
+
+        courses_list = build_courses_summary(all_events)
+        self.log(f"Completed! Found {len(courses_list)} unique courses across {len(all_events)} sessions.")
+        return courses_list, all_events
 
-            cal.events.add(e)
+    def _scrape_week(self, week_idx: int, planned_week: date, current_week: Optional[date]) -> Tuple[Optional[date], List[ClassEvent], Optional[str]]:
+        """Gets planned_week on screen and returns (week_start_date, events, html). A None start date means there are no more weeks."""
+        # Next Week when it's the following week, else jump by date
+        with self.perf.span("week.navigate", week=week_idx + 1):
+            if current_week != planned_week:
+                if current_week is not None and planned_week - current_week == timedelta(weeks=1):
+                    if not self._click_next_week(week_idx):
+                        return None, [], None
+                else:
+                    self._jump_to_week(planned_week)
+
+        # Everything read from the browser is timed as extraction; the parse span is pure Python
+        with self.perf.span("week.extract", week=week_idx + 1, mode=self.extraction_mode):
+            html = self.driver.page_source if (self.extraction_mode == "html" or self.recorder) else None
+            grid = self._extract_grid() if self.extraction_mode != "html" else None
+        with self.perf.span("week.parse", week=week_idx + 1):
+            week_start_date, week_events = parse_week_html(html) if grid is None else self._parse_grid(*grid)
+        return week_start_date, week_events, html
+
+    def _click_next_week(self, week_idx: int) -> bool:
+        """Clicks Next Week and waits for the new grid. Returns False when there is no next week."""
+        from selenium.webdriver.common.by import By
 
+        driver = self.driver
+        next_btn = None
         try:
-            with open(OUTPUT_ICS, 'w', encoding='utf-8') as f:
-                f.write(cal.serialize())
-                
-            with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as output_file:
-                dict_writer = csv.DictWriter(output_file, fieldnames=csv_keys)
-                dict_writer.writeheader()
-                dict_writer.writerows(csv_data)
-                
-            self.log(f"Saved Calendar: {OUTPUT_ICS}")
-            self.log(f"Saved Excel Data: {OUTPUT_CSV}")
-        except PermissionError:
-            raise PermissionError(f"Cannot write files. Ensure they are not open in Excel/Calendar and try again.")
+            next_btn = driver.find_element(By.ID, "DERIVED_CLASS_S_SSR_NEXT_WEEK")
+        except:
+            next_btn = driver.find_element(By.XPATH, "//*[@value='Next Week >>' or @title='Next Week >>']")
 
-    def close(self):
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
+        if not next_btn or not next_btn.is_enabled():
+            return False
 
+        # Wait for PeopleSoft to swap in the next week's grid via AJAX
+        old_week = self._page_state()['week']
+        next_btn.click()
+        # The week label is the reliable signal; only fall back to button staleness without it
+        self._wait_for_ajax(f"Next Week (week {week_idx + 1})", stale_element=None if old_week else next_btn, old_week=old_week)
+        return True
 
-# --- 4. MODERN UI (CustomTkinter) ---
+    def _jump_to_week(self, week_start: date):
+        """Types a date into the schedule's start date field and refreshes, skipping straight to that week."""
+        from selenium.webdriver.common.by import By
 
-class ConflictDialog(ctk.CTkToplevel):
-    """A custom modal dialog to resolve time conflicts."""
-    def __init__(self, parent, ev1, ev2):
-        super().__init__(parent)
-        self.title("⚠️ Time Conflict")
-        self.geometry("650x420")
-        self.attributes("-topmost", True)
-        self.choice = "both"
-        self.protocol("WM_DELETE_WINDOW", self.on_close)
-        
-        # Center the window dynamically over the parent application
-        self.update_idletasks()
+        driver = self.driver
+        old_week = self._page_state()['week']
+        if old_week and week_monday(datetime.strptime(old_week, "%d/%m/%Y").date()) == week_monday(week_start):
+            return  # Already on screen (e.g. a retry after a failed extraction); its label would never change
+        date_field = driver.find_element(By.ID, START_DATE_FIELD)
+        driver.execute_script("arguments[0].value = arguments[1];", date_field, format_ps_date(week_start))
+        refresh_btn = driver.find_element(By.ID, REFRESH_ACTION)
+        refresh_btn.click()
+        self._wait_for_ajax(f"Jump to {week_start:%d %b}", stale_element=refresh_btn, old_week=old_week)
+
+    def _fetch_weeks_over_http(self, week_starts: List[date], empty_weeks: EmptyWeekTracker, checkpoint: ScrapeCheckpoint) -> bool:
+        """Fetches the given weeks with direct component POSTs into the checkpoint. Returns False to fall back to clicking.
+
+        Weeks fetched before a failure stay in the checkpoint, so falling back only pages through the rest.
+        """
         try:
-            x = parent.winfo_x() + (parent.winfo_width() // 2) - (650 // 2)
-            y = parent.winfo_y() + (parent.winfo_height() // 2) - (420 // 2)
-            self.geometry(f"+{x}+{y}")
-        except Exception:
-            pass
-        
-        lbl_warn = ctk.CTkLabel(self, text="⚠️ Time Conflict Detected!", font=("Roboto", 20, "bold"), text_color="#ff9800")
-        lbl_warn.pack(pady=(20, 5))
-        
-        date_str = ev1['date'].strftime('%A, %d %b %Y')
-        lbl_info = ctk.CTkLabel(self, text=f"Date: {date_str}\nOverlap near {ev1['start_time']} - {ev1['end_time']}", font=("Roboto", 14))
-        lbl_info.pack(pady=10)
-        
-        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
-        btn_frame.pack(fill="both", expand=True, padx=20, pady=10)
-        
-        # --- Class A Card ---
-        frame_a = ctk.CTkFrame(btn_frame)
-        frame_a.pack(side="left", fill="both", expand=True, padx=10)
-        ctk.CTkLabel(frame_a, text="OPTION A", font=("Roboto", 12, "bold"), text_color="gray").pack(pady=(10, 0))
-        ctk.CTkLabel(frame_a, text=f"{ev1['code']} - {ev1['section']}", font=("Roboto", 14, "bold")).pack()
-        ctk.CTkLabel(frame_a, text=f"{ev1['title']}", font=("Roboto", 12), wraplength=250).pack(pady=5)
-        ctk.CTkLabel(frame_a, text=f"{ev1['type']}\n{ev1['start_time']} - {ev1['end_time']}\n{ev1['location']}", font=("Roboto", 12)).pack(pady=5)
-        
-        btn_a = ctk.CTkButton(frame_a, text="Keep Class A", command=lambda: self.set_choice('ev1'), fg_color="#2ecc71", hover_color="#27ae60")
-        btn_a.pack(pady=15, side="bottom")
-        
-        # --- Class B Card ---
-        frame_b = ctk.CTkFrame(btn_frame)
-        frame_b.pack(side="right", fill="both", expand=True, padx=10)
-        ctk.CTkLabel(frame_b, text="OPTION B", font=("Roboto", 12, "bold"), text_color="gray").pack(pady=(10, 0))
-        ctk.CTkLabel(frame_b, text=f"{ev2['code']} - {ev2['section']}", font=("Roboto", 14, "bold")).pack()
-        ctk.CTkLabel(frame_b, text=f"{ev2['title']}", font=("Roboto", 12), wraplength=250).pack(pady=5)
-        ctk.CTkLabel(frame_b, text=f"{ev2['type']}\n{ev2['start_time']} - {ev2['end_time']}\n{ev2['location']}", font=("Roboto", 12)).pack(pady=5)
-        
-        btn_b = ctk.CTkButton(frame_b, text="Keep Class B", command=lambda: self.set_choice('ev2'), fg_color="#3498db", hover_color="#2980b9")
-        btn_b.pack(pady=15, side="bottom")
-        
-        # --- Keep Both Button ---
-        btn_both = ctk.CTkButton(self, text="Keep Both (Ignore)", command=lambda: self.set_choice('both'), fg_color="gray", hover_color="#555")
-        btn_both.pack(pady=15)
-        
-        # Make the window modal to intercept user interaction
-        self.grab_set()
+            fetcher = WeekFetcher.from_driver(self.driver)
+        except Exception as e:
+            logging.warning(f"Could not capture the schedule form: {e}")
+            fetcher = None
+        if fetcher is None:
+            self.log("Direct week fetching unavailable. Paging through the browser instead...")
+            return False
 
-    def set_choice(self, choice):
-        self.choice = choice
-        self.grab_release()
-        self.destroy()
+        self.log(f"Fetching up to {len(week_starts)} more weeks over HTTP ({fetcher.max_workers} at a time)...")
+        start = time.perf_counter()
+        fetched = 0
+        last_fetched = None
+        # The caller replays these weeks through its own tracker from the checkpoint; this copy only decides when to stop
+        term_end = empty_weeks.copy()
+        try:
+            # One pool-sized batch at a time, so an ended term costs at most one batch of extra requests
+            for batch_start in range(0, len(week_starts), fetcher.max_workers):
+                batch = week_starts[batch_start:batch_start + fetcher.max_workers]
+                with self.perf.span("week.http_fetch", weeks=len(batch)):
+                    results = fetcher.fetch_weeks(batch)
+                # Past the end of term PeopleSoft keeps returning the last week. Any other wrong week means it
+                # ignored the request (e.g. a rejected ICStateNum), so let the browser take over instead.
+                done = False
+                for requested, html, parsed_start, week_events in results:
+                    if parsed_start != requested:
+                        if fetched and parsed_start == last_fetched:
+                            done = True
+                            break
+                        shown = f"the week of {parsed_start:%d %b}" if parsed_start else "no schedule"
+                        self.log(f"Direct week fetch returned {shown} for {requested:%d %b}. "
+                                 "Paging through the browser for the weeks still missing...")
+                        return False
+                    checkpoint.add_week(requested, week_events)
+                    last_fetched = requested
+                    if self.recorder:
+                        self.recorder.add_week(requested, html)
+                    fetched += 1
+                    if term_end.add(len(week_events)):
+                        done = True
+                        break
+                if done:
+                    break
+        except Exception as e:
+            logging.warning(f"Direct week fetch failed: {e}", exc_info=True)
+            self.log(f"Direct week fetching failed ({e}). Paging through the browser for the weeks still missing...")
+            return False
+        finally:
+            fetcher.close()
+
+        elapsed = time.perf_counter() - start
+        self.log(f"Fetched {fetched} weeks over HTTP in {elapsed:.1f}s ({elapsed / max(fetched, 1):.2f}s per week).")
+        return True
+
+    def _extract_grid(self) -> Tuple[Optional[str], DayColumns, List[Dict]]:
+        """Reads the week on screen with WebDriver calls (bulk or legacy mode), for _parse_grid."""
+        if self.extraction_mode == "bulk":
+            return self._extract_grid_bulk()
+        return self._extract_grid_per_element()
+
+    def _parse_grid(self, week_start_str: Optional[str], columns: DayColumns, cells: List[Dict]) -> Tuple[Optional[date], List[ClassEvent]]:
+        """Turns an extracted grid into (week_start_date, events) without touching the browser."""
+        if not week_start_str:
+            return None, []
+        week_start_date = datetime.strptime(week_start_str, "%d/%m/%Y").date()
+
+        if columns.count < 7:
+            self.log(f"Warning: Only found {columns.count} day columns. Grid parsing might be slightly off.")
+
+        # Parse every candidate cell from the extracted payload
+        events = []
+        for cell in cells:
+            cell_text = cell['text'].strip()
+
+            # Fast filter: Does it contain a time format? If not, skip it.
+            if not TIME_RANGE_RE.search(cell_text):
+                continue
+
+            # Map cell to date using the cached column boundaries, then parse it line by line (safely handling 'Time Conflict')
+            current_date = week_start_date + timedelta(days=columns.day_index(cell['x'], cell['width']))
+            events.extend(parse_cell_text(cell_text, current_date))
+
+        return week_start_date, events
+
+    def _day_columns(self, checksum: Optional[Tuple], measure) -> DayColumns:
+        """Reuses the session's day columns while the header checksum matches, else re-measures them with measure()."""
+        cached = self.day_columns
+        if cached is not None and checksum is not None and cached.checksum == checksum:
+            return cached
+        if cached is not None:
+            self.log("Schedule layout changed; re-measuring day columns.")
+        self.day_columns = DayColumns.from_headers(measure(), checksum)
+        return self.day_columns
+
+    def _extract_grid_bulk(self) -> Tuple[Optional[str], DayColumns, List[Dict]]:
+        """Collects the week label, day header geometry and every time-bearing cell in a single execute_script call."""
+        payload = self.driver.execute_script(GRID_EXTRACT_JS)
+        columns = self._day_columns(tuple(payload['checksum']), lambda: payload['headers'])
+        return payload['week'], columns, payload['cells']
+
+    def _extract_grid_per_element(self) -> Tuple[Optional[str], DayColumns, List[Dict]]:
+        """Legacy extraction: one WebDriver round-trip per attribute of every header and cell."""
+        from selenium.webdriver.common.by import By
 
-    def on_close(self):
-        # Default to keeping both if they force-close the window via 'X'
-        self.set_choice('both')
+        driver = self.driver
 
+        body_text = driver.find_element(By.TAG_NAME, "body").text
+        week_match = WEEK_OF_RE.search(body_text)
+        if not week_match:
+            return None, [], []
 
-class CalendarApp(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-        self.title("SUTD Schedule Export")
-        self.geometry("750x850") 
-        
-        self.bot = SUTDCalendarBot(log_callback=self.update_log)
-        self.courses_data = []
-        self.all_events = [] # Stores all raw scheduled sessions across the term
-        
-        self.selection_vars = {} 
-        self.name_vars = {} 
-        self.config_data = self.load_config() 
+        # Map Day Headers by X-Coordinate to bypass HTML rowspan issues (measured once, then checked with one script call)
+        def measure_headers():
+            day_headers = driver.find_elements(By.XPATH, "//th[contains(., 'Monday') or contains(., 'Tuesday') or contains(., 'Wednesday') or contains(., 'Thursday') or contains(., 'Friday') or contains(., 'Saturday') or contains(., 'Sunday')]")
+            day_coords = []
+            for header in day_headers:
+                text = header.text.strip()
+                # Ensure it's actually a day header
+                if any(day in text for day in DAY_NAMES):
+                    day_coords.append({
+                        'x': header.location['x'],
+                        'width': header.size['width']
+                    })
+            return day_coords
 
-        self.grid_columnconfigure(0, weight=1)
-        self.grid_rowconfigure(2, weight=1) 
+        columns = self._day_columns(tuple(driver.execute_script(HEADER_CHECKSUM_JS)), measure_headers)
 
-        # 1. HEADER
-        self.header_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
-        self.header_frame.grid(row=0, column=0, sticky="ew", padx=20, pady=(20, 10))
-        
-        self.title_lbl = ctk.CTkLabel(self.header_frame, text="SUTD CALENDAR BOT", font=("Roboto Medium", 20))
-        self.title_lbl.pack(side="left")
-        
-        self.subtitle_lbl = ctk.CTkLabel(self.header_frame, text="Smart .ics & .csv Generator", font=("Roboto", 12), text_color="gray")
-        self.subtitle_lbl.pack(side="left", padx=10, pady=(8,0))
+        # Scan EVERY cell in the table body, only measuring the ones holding a class
+        cells = []
+        for td in driver.find_elements(By.XPATH, "//td"):
+            cell_text = td.get_attribute("innerText")
+            if not TIME_RANGE_RE.search(cell_text):
+                continue
+            cells.append({'text': cell_text, 'x': td.location['x'], 'width': td.size['width']})
 
-        # 2. CONTROL PANEL
-        self.ctrl_frame = ctk.CTkFrame(self)
-        self.ctrl_frame.grid(row=1, column=0, sticky="ew", padx=20, pady=5)
-        
-        self.instr_lbl = ctk.CTkLabel(self.ctrl_frame, 
-                                      text="STEP 1: Click 'Start Login & Scan' to begin.", 
-                                      font=("Roboto", 14), anchor="w")
-        self.instr_lbl.pack(fill="x", padx=15, pady=(15, 5))
-
-        self.start_btn = ctk.CTkButton(self.ctrl_frame, text="START LOGIN & SCAN", 
-                                       command=self.start_process, 
-                                       font=("Roboto", 12, "bold"), height=40)
-        self.start_btn.pack(side="left", padx=15, pady=15)
-
-        self.status_lbl = ctk.CTkLabel(self.ctrl_frame, text="Ready", text_color="gray")
-        self.status_lbl.pack(side="left", padx=15)
-
-        # 3. LIST FRAME (Scrollable)
-        self.list_lbl_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self.list_lbl_frame.grid(row=2, column=0, sticky="nsew", padx=20, pady=5)
-        
-        self.list_header = ctk.CTkFrame(self.list_lbl_frame, height=30, fg_color="transparent")
-        self.list_header.pack(fill="x")
-        ctk.CTkLabel(self.list_header, text="DETECTED COURSES", font=("Roboto", 12, "bold")).pack(side="left")
-        
-        self.btn_all = ctk.CTkButton(self.list_header, text="Select All", width=60, height=20, font=("Roboto", 10), command=lambda: self.toggle_all(True))
-        self.btn_all.pack(side="right", padx=5)
-        self.btn_none = ctk.CTkButton(self.list_header, text="Select None", width=60, height=20, font=("Roboto", 10), command=lambda: self.toggle_all(False))
-        self.btn_none.pack(side="right")
+        return week_match.group(1), columns, cells
 
-        self.scroll_area = ctk.CTkScrollableFrame(self.list_lbl_frame, label_text="Course List")
-        self.scroll_area.pack(fill="both", expand=True)
+    @timed("export")
+    def generate_outputs(self, events: List[ClassEvent], reminder_minutes: int = 15, output_dir: Optional[str] = None, recurring: bool = False,
+                         progress=None, cancel_event: Optional['threading.Event'] = None):
+        """Writes the CSV (one row per session) and the ICS, either one VEVENT per session or one weekly RRULE series per class slot.
 
-        # 4. SETTINGS & GENERATE
-        self.bottom_frame = ctk.CTkFrame(self)
-        self.bottom_frame.grid(row=3, column=0, sticky="ew", padx=20, pady=20)
+        UIDs are derived from the class and slot, and a manifest of this export is kept next to the
+        files. When a previous manifest exists, a changes-only ICS is written as well: added events,
+        changed events with a bumped SEQUENCE, and cancellations for events that disappeared.
 
-        ctk.CTkLabel(self.bottom_frame, text="Reminder (min):").pack(side="left", padx=(15, 5))
-        
-        saved_reminder = self.config_data.get("settings", {}).get("default_reminder", 15)
-        self.reminder_var = ctk.StringVar(value=str(saved_reminder))
-        self.rem_entry = ctk.CTkEntry(self.bottom_frame, textvariable=self.reminder_var, width=50)
-        self.rem_entry.pack(side="left")
-
-        self.gen_btn = ctk.CTkButton(self.bottom_frame, text="GENERATE CSV & ICS FILES", 
-                                     command=self.generate_files, 
-                                     font=("Roboto", 14, "bold"), 
-                                     height=50, state="disabled")
-        self.gen_btn.pack(side="right", padx=15, pady=15, fill="x", expand=True)
-        
-        # 5. LOG BOX
-        self.log_box = ctk.CTkTextbox(self, height=80, font=("Consolas", 10))
-        self.log_box.grid(row=4, column=0, sticky="ew", padx=20, pady=(0, 20))
-        self.log_box.insert("0.0", "System Ready. Config loaded.\n")
+        Everything is written to temporary files first and swapped in at the end, so this can run on a
+        worker thread: progress(fraction) is called as it goes, and setting cancel_event stops it with
+        ExportCancelled without touching the previous export.
+        """
+        if not events:
+            self.log("No events to write.")
+            return
 
-    def load_config(self):
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    return json.load(f)
-            except Exception:
-                return {}
-        return {}
-
-    def save_config(self, processed_courses, reminder_val):
-        config = self.config_data
-        
-        if "settings" not in config: config["settings"] = {}
-        config["settings"]["default_reminder"] = reminder_val
-
-        if "courses" not in config: config["courses"] = {}
-        for c in processed_courses:
-            config["courses"][c['code']] = {
-                "custom_name": c['name'],
-            }
-            
-        try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(config, f, indent=4)
-            self.update_log("Preferences saved.")
-        except Exception as e:
-            self.update_log(f"Failed to save config: {e}")
+        def output_path(default_path):
+            return os.path.join(output_dir, os.path.basename(default_path)) if output_dir else default_path
 
-    def update_log(self, message):
-        self.after(0, self._append_log, message)
+        output_ics, output_csv = output_path(OUTPUT_ICS), output_path(OUTPUT_CSV)
+        output_delta, manifest_path = output_path(OUTPUT_DELTA_ICS), output_path(EXPORT_MANIFEST)
 
-    def _append_log(self, message):
-        self.status_lbl.configure(text=message) 
-        self.log_box.insert("end", f"> {message}\n")
-        self.log_box.see("end")
+        self.log(f"Writing ICS and CSV files to {output_dir or 'Desktop'}...")
+        tz = get_timezone(TIMEZONE)
+        previous = ExportManifest.load(manifest_path)
+        manifest = ExportManifest(manifest_path)
+        delta_entries = []
+        written = []  # (temporary path, final path), swapped in only once everything succeeded
 
-    def start_process(self):
-        self.start_btn.configure(state="disabled")
-        threading.Thread(target=self.run_selenium_task, daemon=True).start()
+        def check_cancelled(fraction):
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportCancelled("Export cancelled.")
+            if progress:
+                progress(min(fraction, 1.0))
 
-    def run_selenium_task(self):
-        try:
-            self.bot.start_browser()
-            self.bot.login_and_prepare_grid()
-            courses, all_events = self.bot.scrape_calendar_grid()
-            self.bot.close()
-            
-            try:
-                self.after(0, lambda: self.state('zoomed'))
-            except: pass
+        def temp_path(path):
+            written.append((path + ".part", path))
+            return path + ".part"
 
-            # Intecept with the conflict resolver instead of going straight to the UI
-            self.after(0, self.start_conflict_resolution, courses, all_events)
-        except Exception as e:
-            logging.error(f"Selenium Task Error: {e}", exc_info=True)
-            self.after(0, messagebox.showerror, "Error", str(e))
-            self.after(0, self.reset_ui)
-            if self.bot.driver: self.bot.close()
-
-    @staticmethod
-    def _times_overlap(start1_str, end1_str, start2_str, end2_str):
-        """Helper function to calculate if two 12-hour time intervals overlap."""
-        fmt = "%I:%M%p"
         try:
-            s1 = datetime.strptime(start1_str, fmt).time()
-            e1 = datetime.strptime(end1_str, fmt).time()
-            s2 = datetime.strptime(start2_str, fmt).time()
-            e2 = datetime.strptime(end2_str, fmt).time()
-            return s1 < e2 and s2 < e1
-        except Exception:
-            return False
-
-    def start_conflict_resolution(self, courses, all_events):
-        self.courses_data = courses
-        self.all_events = all_events
-        
-        # 1. Deduplicate the raw scrape first to prevent false alarms
-        unique_events = []
-        seen = set()
-        for ev in self.all_events:
-            ev_tuple = (ev['code'], ev['type'], ev['date'], ev['start_time'])
-            if ev_tuple not in seen:
-                seen.add(ev_tuple)
-                unique_events.append(ev)
-        self.all_events = unique_events
-
-        # 2. Iterate through events and resolve conflicts interactively
-        ignored_pairs = set()
-        
-        while True:
-            conflict_pair = None
-            
-            # Scan for the first active conflict
-            for i in range(len(self.all_events)):
-                for j in range(i + 1, len(self.all_events)):
-                    ev1 = self.all_events[i]
-                    ev2 = self.all_events[j]
-                    
-                    pair_id = frozenset([id(ev1), id(ev2)])
-                    if pair_id in ignored_pairs:
-                        continue
-                        
-                    # If it's the exact same course/type (edge case), ignore as conflict
-                    if ev1['code'] == ev2['code'] and ev1['type'] == ev2['type']:
-                        continue
-                        
-                    if ev1['date'] == ev2['date'] and self._times_overlap(ev1['start_time'], ev1['end_time'], ev2['start_time'], ev2['end_time']):
-                        conflict_pair = (i, j, pair_id)
-                        break
-                if conflict_pair:
-                    break
-                    
-            # If no conflicts found, break the while loop and move to final UI
-            if not conflict_pair:
-                break 
-                
-            i, j, pair_id = conflict_pair
-            ev1 = self.all_events[i]
-            ev2 = self.all_events[j]
-            
-            self.update_log(f"Resolving clash: {ev1['code']} vs {ev2['code']}")
-            
-            # Spawn modal and wait for user response
-            dialog = ConflictDialog(self, ev1, ev2)
-            self.wait_window(dialog)
-            
-            # Apply user decision
-            if dialog.choice == 'ev1':
-                self.all_events.pop(j) # Destroy Class B
-            elif dialog.choice == 'ev2':
-                self.all_events.pop(i) # Destroy Class A
-            else:
-                ignored_pairs.add(pair_id) # Remember that they wanted to keep both
+            # 1. Stream each entry straight to disk (times are already minutes, so no string parsing here)
+            with open(temp_path(output_ics), 'w', encoding='utf-8', newline='') as f, ICSWriter(f) as ics_writer:
+                for entry in self._ics_entries(events, tz, recurring):
+                    status, entry['sequence'] = manifest.record(entry, reminder_minutes, previous)
+                    ics_writer.write_event(reminder_minutes=reminder_minutes, **entry)
+                    if status != 'unchanged':
+                        delta_entries.append(entry)
+                    if ics_writer.count % PROGRESS_EVERY == 0:
+                        # Recurring exports write fewer entries than sessions, so this only runs ahead of itself
+                        check_cancelled(0.8 * ics_writer.count / len(events))
+
+            # 2. Changes-only ICS against the previous export
+            check_cancelled(0.8)
+            if previous is not None:
+                added = sum(1 for entry in delta_entries if entry['sequence'] == 0)
+                cancelled = manifest.cancelled_since(previous)
+                with open(temp_path(output_delta), 'w', encoding='utf-8', newline='') as f, ICSWriter(f) as delta_writer:
+                    for entry in delta_entries + cancelled:
+                        delta_writer.write_event(reminder_minutes=reminder_minutes, **entry)
+
+            # 3. CSV
+            check_cancelled(0.9)
+            with open(temp_path(output_csv), 'w', newline='', encoding='utf-8') as output_file:
+                dict_writer = csv.DictWriter(output_file, fieldnames=CSV_FIELDS)
+                dict_writer.writeheader()
+                dict_writer.writerows(ev.as_csv_row() for ev in events)
+
+            # 4. Last chance to cancel, then swap everything in and remember this export
+            check_cancelled(1.0)
+            for part, final in written:
+                os.replace(part, final)
+            written.clear()
+            manifest.save()
+
+            if previous is not None:
+                self.log(f"Saved Changes: {output_delta} ({added} added, {len(delta_entries) - added} changed, {len(cancelled)} cancelled)")
+            self.log(f"Saved Calendar: {output_ics} ({ics_writer.count} calendar entries for {len(events)} sessions)")
+            self.log(f"Saved Excel Data: {output_csv}")
+        except PermissionError:
+            raise PermissionError(f"Cannot write files. Ensure they are not open in Excel/Calendar and try again.")
+        finally:
+            for part, _ in written:
+                if os.path.exists(part):
+                    os.remove(part)
+
+    def _ics_entries(self, events: List[ClassEvent], tz, recurring: bool):
+        """Yields the keyword arguments for ICSWriter.write_event, one dict per calendar entry."""
+        if not recurring:
+            for ev in events:
+                yield ics_entry(ev, tz, uid=stable_uid(ev.code, ev.section, ev.type, ev.date.isoformat(), ev.start))
+            return
+        for series in group_weekly_series(events):
+            yield from self._ics_series_entries(series, tz)
+
+    def _ics_series_entries(self, series: List[ClassEvent], tz):
+        """A weekly series as one RRULE entry, EXDATEs for skipped weeks and overrides for one-off changes."""
+        first, last = series[0], series[-1]
+        uid = stable_uid(first.code, first.section, first.type, WEEKDAY_ABBR[first.date.weekday()], first.start, first.end, first.location)
+        if len(series) == 1:
+            yield ics_entry(first, tz, uid=uid)
+            return
 
-        # 3. Finished resolving! Proceed to normal selection UI
-        self.show_selection_ui(self.courses_data, self.all_events)
+        # Every week between the first and last session that has no session (recess, removed clashes)
+        held = {ev.date for ev in series}
+        weeks = (last.date - first.date).days // 7
+        skipped = [first.date + timedelta(weeks=w) for w in range(1, weeks)]
+        exdates = [datetime.combine(d, first.begin_at(tz).timetz()) for d in skipped if d not in held]
 
-    def show_selection_ui(self, courses, all_events):
-        self.courses_data = courses
-        self.all_events = all_events
-        self.start_btn.configure(text="RESCAN", state="normal", fg_color="#333")
-        self.gen_btn.configure(state="normal")
-        
-        instructions = (
-            "STEP 2: CUSTOMIZE\n"
-            "• Rename: Edit text boxes.\n"
-            "• Filter: Uncheck unwanted classes.\n"
-            "• Finalize: Click Generate."
+        yield ics_entry(
+            first, tz, uid=uid,
+            rrule=f"FREQ=WEEKLY;UNTIL={format_utc(last.begin_at(tz))}",
+            exdates=exdates,
         )
-        self.instr_lbl.configure(text=instructions)
-
-        for widget in self.scroll_area.winfo_children():
-            widget.destroy()
-            
-        self.selection_vars = {}
-        self.name_vars = {}
-        
-        self.update_log("Review courses and generate.")
 
-        if not courses:
-             ctk.CTkLabel(self.scroll_area, text="No courses found in schedule!", text_color="red").pack(pady=20)
-             self.gen_btn.configure(state="disabled")
-             return
+        # Sessions whose title or instructors differ from the first one become overrides of that instance
+        for ev in series[1:]:
+            if ev.title != first.title or ev.instructors != first.instructors:
+                yield ics_entry(ev, tz, uid=uid, recurrence_id=ev.begin_at(tz))
 
-        for i, course in enumerate(courses):
-            card = ctk.CTkFrame(self.scroll_area)
-            card.pack(fill="x", padx=5, pady=5)
-            
-            header = ctk.CTkFrame(card, fg_color="transparent")
-            header.pack(fill="x", padx=5, pady=5)
-            
-            ctk.CTkLabel(header, text=course['code'], font=("Roboto", 12, "bold"), text_color="gray").pack(side="left")
-            
-            saved_courses = self.config_data.get("courses", {})
-            saved_info = saved_courses.get(course['code'], {})
-            default_name = saved_info.get("custom_name", course['name'])
-
-            name_var = ctk.StringVar(value=default_name)
-            self.name_vars[i] = name_var
-            
-            name_entry = ctk.CTkEntry(header, textvariable=name_var, height=28)
-            name_entry.pack(side="left", fill="x", expand=True, padx=10)
-            
-            chk_frame = ctk.CTkFrame(card, fg_color="transparent")
-            chk_frame.pack(fill="x", padx=10, pady=5)
-
-            for type_code in course['type'].keys():
-                friendly_name = str(TYPE_MAPPING.get(type_code) or type_code)
-                var = ctk.BooleanVar(value=True)
-                chk = ctk.CTkCheckBox(chk_frame, text=friendly_name, variable=var)
-                chk.pack(side="left", padx=10)
-                self.selection_vars[(i, type_code)] = var
-
-    def toggle_all(self, state):
-        for var in self.selection_vars.values():
-            var.set(state)
-
-    def generate_files(self):
-        filtered_events = []
-        
-        # 1. Map out which (course index, type) are checked
-        allowed_types = {}
-        for (i, t), var in self.selection_vars.items():
-            allowed_types[(i, t)] = var.get()
-            
-        # 2. Get the custom renamed text
-        custom_names = {}
-        for i, course in enumerate(self.courses_data):
-            custom_names[course['code']] = self.name_vars[i].get() or course['name']
-
-        # 3. Filter the massive raw events list based on UI selections
-        for ev in self.all_events:
-            course_idx = next((i for i, c in enumerate(self.courses_data) if c['code'] == ev['code']), -1)
-            
-            if course_idx != -1 and allowed_types.get((course_idx, ev['type']), False):
-                ev_copy = ev.copy()
-                ev_copy['title'] = custom_names[ev['code']]
-                filtered_events.append(ev_copy)
+    def save_to_store(self, weeks: Dict[date, List[ClassEvent]]):
+        """With --store, replaces the given weeks (Monday -> sessions) in the SQLite session store."""
+        if not self.store_path or not weeks:
+            return
+        import sqlite3
+        from sutd_store import EventStore
 
-        self.update_log(f"Processing {len(filtered_events)} class sessions...")
-        
         try:
-            try:
-                rem_mins = int(self.reminder_var.get())
-            except ValueError:
-                rem_mins = 15
-            
-            # Save configs
-            processed_courses = [{'code': c['code'], 'name': custom_names[c['code']]} for c in self.courses_data]
-            self.save_config(processed_courses, rem_mins)
+            with self.perf.span("store", weeks=len(weeks)), EventStore(self.store_path) as store:
+                count = store.save_weeks(weeks)
+            self.log(f"Stored {count} sessions for {len(weeks)} weeks in {self.store_path}.")
+        except (sqlite3.Error, ValueError) as e:
+            logging.warning(f"Could not update the session store: {e}", exc_info=True)
+            self.log(f"Could not update the session store ({e}). The export is not affected.")
+
+    def log_perf_summary(self):
+        """Logs the per-phase timing table and, with --profile, writes the cProfile dump."""
+        lines = self.perf.summary_lines()
+        if lines:
+            self.log("Performance summary:")
+            for line in lines:
+                self.log(line)
+        if self.profile_path:
+            top = self.perf.dump_profile(self.profile_path)
+            if top:
+                logging.info("cProfile (post-scrape pipeline):\n" + "\n".join(top))
+                self.log(f"Profile written to {self.profile_path} (view with: python -m pstats {self.profile_path})")
 
-            # Generate outputs
-            self.bot.generate_outputs(filtered_events, reminder_minutes=rem_mins)
-            
-            self.withdraw()
-            output_dir = DESKTOP_PATH
-            if os.name == 'nt':
-                os.startfile(output_dir)
-            elif os.name == 'posix':
-                try:
-                    subprocess.call(['open', output_dir])
-                except:
-                    pass
+    def close(self):
+        if self.recorder:
+            self.recorder.close()
+            self.log(f"Saved snapshot: {self.recorder.path}")
+            self.recorder = None
+        if self.driver:
+            try:
+                self.driver.quit()
+            except:
+                pass
 
-            messagebox.showinfo("Success", f"Calendar files generated successfully!\n\nSaved to:\n{output_dir}")
-            self.destroy()
 
-        except Exception as e:
-            logging.error(f"Generation Failed: {e}", exc_info=True)
-            messagebox.showerror("Generation Error", str(e))
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a calendar from your SUTD Weekly Schedule.")
+    parser.add_argument("--browser-paging", action="store_true",
+                        help="Click Next Week in the browser for every week instead of fetching weeks over HTTP.")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="Only scrape classes on or after this date (for partial re-syncs).")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="Only scrape classes on or before this date.")
+    parser.add_argument("--max-empty-weeks", type=int, default=DEFAULT_MAX_EMPTY_WEEKS,
+                        help=f"Stop after this many weeks in a row without classes (0 = never; default: {DEFAULT_MAX_EMPTY_WEEKS}).")
+    parser.add_argument("--portal-url", default=PORTAL_URL, help="Portal entry URL (point this at sutd_stub_portal.py for offline testing).")
+    parser.add_argument("--record", metavar="SNAPSHOT", help="Save every scraped week's raw grid HTML to this snapshot archive (.zip).")
+    parser.add_argument("--replay", metavar="SNAPSHOT", help="Run parse, dedup and export from a recorded snapshot without a browser.")
+    parser.add_argument("--benchmark", metavar="PATH", nargs="+", help="Benchmark the offline pipeline over snapshot archives or directories of them.")
+    parser.add_argument("--batch", metavar="DIR", help="Export a calendar per student from a directory of snapshots (*.zip or folders of .html pages).")
+    parser.add_argument("--workers", type=int, help="Worker processes for --batch (default: one per CPU core).")
+    parser.add_argument("--rules", metavar="CONFIG", help="JSON file with conflict_rules applied by --batch (e.g. a saved sutd_bot_config.json).")
+    parser.add_argument("--reset-conflicts", action="store_true", help="Forget every remembered clash choice so the next scan asks again.")
+    parser.add_argument("--profile", metavar="FILE", help="cProfile the post-scrape pipeline (conflicts, selection, export) and save the stats here.")
+    parser.add_argument("--repeat", type=int, default=3, help="Benchmark repetitions per snapshot or startup measurement (default: 3).")
+    parser.add_argument("--startup-benchmark", action="store_true",
+                        help="Measure cold import time of the headless and GUI entry points with -X importtime.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_STARTUP_BUDGET_MS,
+                        help=f"Headless import budget for --startup-benchmark; exits non-zero when exceeded (default: {DEFAULT_STARTUP_BUDGET_MS:g}).")
+    parser.add_argument("--store", nargs="?", const=STORE_FILE, metavar="DB",
+                        help=f"Keep every scraped (or replayed) session in this SQLite database (default: {os.path.basename(STORE_FILE)}).")
+    parser.add_argument("--query", action="store_true",
+                        help="Print sessions from the --store database, filtered by --from/--to, --week, --code, --type, --location and --term.")
+    parser.add_argument("--week", choices=["this", "next"], help="With --query or --free-slots, only this or next week.")
+    parser.add_argument("--code", help="With --query, only this course code (e.g. 50.002).")
+    parser.add_argument("--type", dest="class_type", help="With --query, only this class type (e.g. LAB).")
+    parser.add_argument("--location", help="With --query, only rooms starting with this (e.g. 1.502).")
+    parser.add_argument("--term", help="With --query, only this term, named by the year and the month it starts: 2025-Jan (Jan-Apr), 2025-May (May-Aug) or 2025-Sep (Sep-Dec).")
+    parser.add_argument("--hours", action="store_true", help="With --query, print hours per course instead (default: this term).")
+    parser.add_argument("--export-csv", metavar="FILE", help="With --query, stream the matching sessions to a CSV file.")
+    parser.add_argument("--export-ics", metavar="FILE", help="With --query, stream the matching sessions to an ICS file.")
+    parser.add_argument("--free-slots", metavar="DIR",
+                        help="Find common free meeting slots across the CSV schedules in DIR (<student>.csv or a --batch output folder).")
+    parser.add_argument("--group", help="With --free-slots, comma-separated students to include (default: everyone).")
+    parser.add_argument("--duration", type=positive_int, default=60, help="With --free-slots, meeting length in minutes (default: 60).")
+    parser.add_argument("--top", type=int, default=5, help="With --free-slots, how many slots to suggest (default: 5).")
+    parser.add_argument("--scrape-benchmark", nargs="*", choices=["http", "html", "bulk", "legacy"], metavar="MODE",
+                        help="Scrape the local stub portal in headless Chrome with each mode (default: all) and report "
+                             "seconds and WebDriver commands per week.")
+    parser.add_argument("--stub-latency", type=float, default=0.3, help="Seconds per schedule request on the stub for --scrape-benchmark (default: 0.3).")
+    parser.add_argument("--stub-courses", type=int, help="Give the stub a generated timetable with this many courses.")
+    parser.add_argument("--show-browser", action="store_true", help="Show the browser window during --scrape-benchmark.")
+    parser.add_argument("--output-dir", help="Where --replay/--batch write their files (default: Desktop, or Desktop/SUTD_Cohort_Calendars for --batch).")
+    parser.add_argument("--reminder", type=int, default=15, help="Reminder minutes used by --replay and --batch (default: 15).")
+    parser.add_argument("--recurring", action="store_true", help="With --replay or --batch, write one weekly repeating event per class slot instead of one per session.")
+    return parser.parse_args(argv)
+
+
+def reset_conflict_rules(path=CONFIG_FILE) -> int:
+    """Removes the remembered clash choices from the config, keeping every other setting. Returns how many were dropped."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'r') as f:
+        config = json.load(f)
+    rules = config.pop("conflict_rules", None) or {}
+    if rules:
+        with open(path, 'w') as f:
+            json.dump(config, f, indent=4)
+    return len(rules)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+
+    # Headless modes never import Tk or Selenium
+    if args.reset_conflicts:
+        print(f"Forgot {reset_conflict_rules()} remembered clash choices.")
+        return 0
+    if args.startup_benchmark:
+        return 0 if run_startup_benchmark(repeat=args.repeat, budget_ms=args.budget_ms) else 1
+    if args.batch:
+        from sutd_batch import run_batch
+        output_dir = args.output_dir or os.path.join(DESKTOP_PATH, "SUTD_Cohort_Calendars")
+        results = run_batch(args.batch, output_dir, rules_path=args.rules, workers=args.workers,
+                            reminder_minutes=args.reminder, recurring=args.recurring)
+        return 0 if all(r['status'] == 'ok' for r in results) else 1
+    if args.query:
+        from sutd_store import run_query, term_of, week_range
+        date_from, date_to = week_range(args.week) if args.week else (args.date_from, args.date_to)
+        term = args.term or (term_of(date.today()) if args.hours and not (date_from or date_to) else None)
+        filters = dict(date_from=date_from, date_to=date_to, code=args.code, type=args.class_type,
+                       location=args.location, term=term)
+        return run_query(args.store or STORE_FILE, filters, hours=args.hours, export_csv=args.export_csv,
+                         export_ics=args.export_ics, reminder_minutes=args.reminder)
+    if args.free_slots:
+        from sutd_freeslots import run_free_slots
+        date_from = args.date_from or date.today()
+        date_to = args.date_to or date_from + timedelta(days=6)
+        if args.week:
+            from sutd_store import week_range
+            date_from, date_to = week_range(args.week)
+        group = [student.strip() for student in args.group.split(",")] if args.group else None
+        return run_free_slots(args.free_slots, date_from, date_to, group=group,
+                              duration_minutes=args.duration, top_n=args.top)
+    if args.scrape_benchmark is not None:
+        check_and_install_dependencies(SCRAPE_PACKAGES)  # Headless Chrome against the stub: no GUI toolkit
+        from sutd_scrape_bench import run_scrape_benchmark, run_session_checks
+        from sutd_stub_portal import StubConfig, synthetic_timetable
+        config = StubConfig(latency=args.stub_latency)
+        if args.stub_courses:
+            config.timetable = synthetic_timetable(args.stub_courses)
+        rows = run_scrape_benchmark(args.scrape_benchmark or None, config, repeat=args.repeat, headless=not args.show_browser)
+        sessions_ok = run_session_checks(StubConfig(), headless=not args.show_browser)
+        return 0 if sessions_ok and all(row['sessions'] == row['expected'] for row in rows) else 1
+    if args.benchmark:
+        run_benchmark(args.benchmark, SUTDCalendarBot(perf_log=None), repeat=args.repeat)
+    elif args.replay:
+        bot = SUTDCalendarBot()
+        bot.profile_path = args.profile
+        bot.store_path = args.store
+        with bot.perf.profiling(args.profile is not None):
+            replay_snapshot(args.replay, bot, reminder_minutes=args.reminder, output_dir=args.output_dir, recurring=args.recurring)
+        bot.log_perf_summary()
+    else:
+        check_and_install_dependencies()
+        from sutd_gui import launch_app
+        launch_app(args)
+    return 0
 
-    def reset_ui(self):
-        self.start_btn.configure(state="normal")
 
 if __name__ == "__main__":
-    app = CalendarApp()
-    app.mainloop()
\ No newline at end of file
+    # In a frozen build, --batch's pool workers start this exe again; this turns them into workers instead of re-running main()
+    import multiprocessing
+    multiprocessing.freeze_support()
+    # Let sutd_gui's "from sutd_calendar_bot import ..." reuse this module instead of loading it a second time
+    sys.modules.setdefault("sutd_calendar_bot", sys.modules[__name__])
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,104 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Per-week scrape checkpoints, so a crashed run resumes where it stopped.
+
+Every week is appended to a JSON-lines file as soon as it is parsed, keyed by
+its week start date. The first line is a header with the creation time, the
+portal URL and the logged-in student; a restarted run reuses the weeks already
+on disk (when the file is recent enough and was written for the same portal and
+student) and only loads the rest. A half-written last line from a crash is
+ignored. The file is removed once a scrape completes without failed weeks.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import date
+from typing import Dict, List, Optional
+
+from sutd_events import ClassEvent
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_MAX_AGE = 12 * 3600  # Seconds before a leftover checkpoint is considered stale and ignored
+
+
+def _event_fields(ev: ClassEvent) -> list:
+    return [ev.code, ev.section, ev.title, ev.type, ev.date.isoformat(), ev.start, ev.end, ev.location, ev.instructors]
+
+
+def _event_from_fields(fields: list) -> ClassEvent:
+    code, section, title, type_, day, start, end, location, instructors = fields
+    return ClassEvent(code, section, title, type_, date.fromisoformat(day), start, end, location, instructors)
+
+
+class ScrapeCheckpoint:
+    """The weeks scraped so far in this (or an interrupted earlier) run."""
+
+    def __init__(self, path: Optional[str], weeks: Optional[Dict[date, List[ClassEvent]]] = None,
+                 portal_url: Optional[str] = None, user: Optional[str] = None):
+        self.path = path
+        self.portal_url = portal_url
+        self.user = user
+        self.weeks: Dict[date, List[ClassEvent]] = weeks or {}
+        self.resumed = len(self.weeks)  # Weeks that came from disk rather than this run
+
+    @classmethod
+    def load(cls, path: Optional[str], portal_url: Optional[str] = None, user: Optional[str] = None,
+             max_age: float = CHECKPOINT_MAX_AGE) -> 'ScrapeCheckpoint':
+        """Reads a checkpoint left by an earlier run of this portal and user.
+
+        Missing, stale or unreadable files give an empty one, and so does a file written for
+        another portal or student (it is deleted, so their weeks never mix with this run's).
+        """
+        if not path or not os.path.exists(path):
+            return cls(path, portal_url=portal_url, user=user)
+        weeks = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline() or '{}')
+                if (header.get('version') != CHECKPOINT_VERSION or time.time() - header.get('created', 0) > max_age
+                        or header.get('portal_url') != portal_url or header.get('user') != user):
+                    f.close()
+                    os.remove(path)
+                    return cls(path, portal_url=portal_url, user=user)
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        weeks[date.fromisoformat(record['week'])] = [_event_from_fields(ev) for ev in record['events']]
+                    except (ValueError, KeyError, TypeError):
+                        break  # Torn write from the crash; everything before it is good
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable scrape checkpoint {path}: {e}")
+            return cls(path, portal_url=portal_url, user=user)
+        return cls(path, weeks, portal_url, user)
+
+    def __contains__(self, week_start: date) -> bool:
+        return week_start in self.weeks
+
+    def add_week(self, week_start: date, events: List[ClassEvent]):
+        """Keeps the week and appends it to disk straight away."""
+        self.weeks[week_start] = list(events)
+        if not self.path:
+            return
+        try:
+            new_file = not os.path.exists(self.path)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if new_file:
+                    f.write(json.dumps({'version': CHECKPOINT_VERSION, 'created': time.time(),
+                                        'portal_url': self.portal_url, 'user': self.user}) + "\n")
+                f.write(json.dumps({'week': week_start.isoformat(), 'events': [_event_fields(ev) for ev in events]}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logging.warning(f"Could not write scrape checkpoint: {e}")
+            self.path = None
+
+    def clear(self):
+        """Drops the file once the term has been scraped completely."""
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,234 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Pure helpers for scraped class sessions, shared by the GUI and the headless pipelines."""
+
+import sys
+from collections import defaultdict
+from datetime import date, datetime, time as dt_time, tzinfo
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+WEEKDAY_ABBR = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+CSV_FIELDS = ["Date", "Course Code", "Section", "Title", "Type", "Start Time", "End Time", "Location", "Instructors"]
+TIMEZONE = "Asia/Singapore"  # Every session's times are local to campus
+
+# TYPE MAPPING
+TYPE_MAPPING = {
+    "CBL": "Cohort Class",
+    "LEC": "Lecture",
+    "LAB": "Lab",
+    "TUT": "Tutorial",
+    "REC": "Recitation",
+    "TES": "Test/Exam"
+}
+
+
+class ClassEvent:
+    """One scheduled class session.
+
+    Times are stored as minutes after midnight so overlap checks and exports never
+    re-parse strings, and the short, heavily repeated fields are interned. Item access
+    (``ev['code']``, ``ev['start_time']``) is kept as a read-only dict-style view.
+    """
+    __slots__ = ('code', 'section', 'title', 'type', 'date', 'start', 'end', 'location', 'instructors')
+
+    def __init__(self, code: str, section: str, title: str, type: str, date: date,
+                 start: int, end: int, location: str, instructors: str):
+        self.code = sys.intern(code)
+        self.section = sys.intern(section)
+        self.title = title
+        self.type = sys.intern(type)
+        self.date = date
+        self.start = start
+        self.end = end
+        self.location = sys.intern(location)
+        self.instructors = instructors
+
+    @property
+    def start_time(self) -> str:
+        return minutes_to_time(self.start)
+
+    @property
+    def end_time(self) -> str:
+        return minutes_to_time(self.end)
+
+    def begin_at(self, tz: Optional[tzinfo] = None) -> datetime:
+        return datetime.combine(self.date, dt_time(self.start // 60, self.start % 60), tzinfo=tz)
+
+    def end_at(self, tz: Optional[tzinfo] = None) -> datetime:
+        return datetime.combine(self.date, dt_time(self.end // 60, self.end % 60), tzinfo=tz)
+
+    def with_title(self, title: str) -> 'ClassEvent':
+        return ClassEvent(self.code, self.section, title, self.type, self.date,
+                          self.start, self.end, self.location, self.instructors)
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def as_csv_row(self) -> Dict[str, str]:
+        return {
+            "Date": self.date.strftime('%Y-%m-%d'),
+            "Course Code": self.code,
+            "Section": self.section,
+            "Title": self.title,
+            "Type": self.type,
+            "Start Time": self.start_time,
+            "End Time": self.end_time,
+            "Location": self.location,
+            "Instructors": self.instructors
+        }
+
+    def __repr__(self):
+        return (f"ClassEvent({self.code}-{self.section} {self.type} {self.date.isoformat()} "
+                f"{self.start_time}-{self.end_time} @ {self.location})")
+
+
+def dedupe_events(events: List[ClassEvent]) -> List[ClassEvent]:
+    """Drops repeated sessions (same code, type, date and start) that the grid can render more than once."""
+    unique_events = []
+    seen = set()
+    for ev in events:
+        ev_tuple = (ev.code, ev.type, ev.date, ev.start)
+        if ev_tuple not in seen:
+            seen.add(ev_tuple)
+            unique_events.append(ev)
+    return unique_events
+
+
+@lru_cache(maxsize=None)
+def time_to_minutes(time_str: str) -> Optional[int]:
+    """Converts a grid time like '9:00AM' into minutes after midnight (None if it can't be read)."""
+    try:
+        clock, meridiem = time_str[:-2], time_str[-2:].upper()
+        hours, minutes = (int(part) for part in clock.split(':'))
+    except ValueError:
+        return None
+    if meridiem not in ('AM', 'PM') or not (1 <= hours <= 12 and 0 <= minutes < 60):
+        return None
+    return (hours % 12 + (12 if meridiem == 'PM' else 0)) * 60 + minutes
+
+
+def minutes_to_time(minutes: int) -> str:
+    """Formats minutes after midnight the way the grid shows them, e.g. 540 -> '9:00AM'."""
+    hours, mins = divmod(minutes, 60)
+    return f"{(hours - 1) % 12 + 1}:{mins:02d}{'PM' if hours >= 12 else 'AM'}"
+
+
+def find_day_conflicts(day_events: List[ClassEvent]) -> List[Tuple[ClassEvent, ClassEvent]]:
+    """Sweeps one day's sessions in start order and returns every overlapping pair of different classes."""
+    intervals = [(ev.start, order, ev.end, ev) for order, ev in enumerate(day_events)]
+    intervals.sort(key=lambda iv: (iv[0], iv[1]))
+
+    pairs = []
+    active = []  # intervals that started earlier and may still be running
+    for start, order, end, ev in intervals:
+        active = [iv for iv in active if iv[2] > start]
+        for other_start, other_order, other_end, other in active:
+            # Same course & type (edge case) is never treated as a conflict
+            if other.code == ev.code and other.type == ev.type:
+                continue
+            if start < other_end and other_start < end:
+                pairs.append((other, ev) if other_order < order else (ev, other))
+        active.append((start, order, end, ev))
+    return pairs
+
+
+def find_conflicts(events: List[ClassEvent]) -> Dict[date, List[Tuple[ClassEvent, ClassEvent]]]:
+    """Groups sessions by date and returns {date: [overlapping pairs]} for every day that has a clash."""
+    by_date = defaultdict(list)
+    for ev in events:
+        by_date[ev.date].append(ev)
+
+    conflicts = {}
+    for day in sorted(by_date):
+        pairs = find_day_conflicts(by_date[day])
+        if pairs:
+            conflicts[day] = pairs
+    return conflicts
+
+
+def conflict_side_key(ev: ClassEvent) -> str:
+    """Identifies one side of a recurring clash: the same class, weekday and time every week."""
+    return f"{ev.code} {ev.section} {ev.type} {WEEKDAY_ABBR[ev.date.weekday()]} {ev.start_time}-{ev.end_time}"
+
+
+def conflict_rule_key(ev1: ClassEvent, ev2: ClassEvent) -> str:
+    """Order-independent key for a clashing pair, used to store the user's decision for the whole term."""
+    return " | ".join(sorted((conflict_side_key(ev1), conflict_side_key(ev2))))
+
+
+def group_conflicts_by_rule(conflicts: Dict[date, List[Tuple[ClassEvent, ClassEvent]]]) -> Dict[str, List[Tuple[ClassEvent, ClassEvent]]]:
+    """Collapses per-day clashes into one entry per distinct recurring clash, in date order of first occurrence."""
+    grouped = {}
+    for day in sorted(conflicts):
+        for ev1, ev2 in conflicts[day]:
+            grouped.setdefault(conflict_rule_key(ev1, ev2), []).append((ev1, ev2))
+    return grouped
+
+
+def group_weekly_series(events: List[ClassEvent]) -> List[List[ClassEvent]]:
+    """Groups sessions of the same class, weekday, time and room into weekly series, each sorted by date."""
+    series = {}
+    for ev in events:
+        key = (ev.code, ev.section, ev.type, ev.date.weekday(), ev.start, ev.end, ev.location)
+        series.setdefault(key, []).append(ev)
+    return [sorted(group, key=lambda e: e.date) for group in series.values()]
+
+
+def ics_entry(ev: ClassEvent, tz, **series_fields) -> Dict:
+    """The keyword arguments for ICSWriter.write_event for one session (plus any uid/RRULE fields given)."""
+    friendly_type = TYPE_MAPPING.get(ev.type, ev.type)
+    return dict(
+        begin=ev.begin_at(tz),
+        end=ev.end_at(tz),
+        summary=f"{ev.title} ({friendly_type})",
+        location=ev.location,
+        description=f"Course: {ev.code} {ev.section}\nInstructors: {ev.instructors}",
+        **series_fields
+    )
+
+
+def resolve_conflicts(events: List[ClassEvent], rules: Dict[str, str], ask=None) -> Tuple[List[ClassEvent], Dict]:
+    """Applies clash decisions ({rule key: side key of the class to keep, or "both"}) to every date a clash occurs on.
+
+    Clashes without a saved rule go to ask(ev1, ev2, occurrences), which returns the side key
+    to keep or "both"; the answer is stored in rules. None (the question was dismissed) keeps
+    both this time without storing anything. Without ask they are left as-is.
+    Returns (kept_events, stats).
+    """
+    grouped = group_conflicts_by_rule(find_conflicts(events))
+    removed = set()
+    prompts = unresolved = 0
+
+    for rule_key, pairs in grouped.items():
+        # Earlier decisions may already have dropped one side of some of these dates
+        pairs = [(a, b) for a, b in pairs if id(a) not in removed and id(b) not in removed]
+        if not pairs:
+            continue
+
+        keep = rules.get(rule_key)
+        if keep is None:
+            if ask is None:
+                unresolved += 1
+                continue
+            keep = ask(pairs[0][0], pairs[0][1], len(pairs))
+            prompts += 1
+            if keep is None:
+                unresolved += 1
+                continue
+            rules[rule_key] = keep
+
+        if keep == "both":
+            continue
+        for a, b in pairs:
+            removed.add(id(b) if conflict_side_key(a) == keep else id(a))
+
+    kept = [ev for ev in events if id(ev) not in removed] if removed else events
+    return kept, {'clashes': len(grouped), 'prompts': prompts, 'unresolved': unresolved, 'removed': len(removed)}
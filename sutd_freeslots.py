@@ -0,0 +1,219 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Finds common free time across many students' schedules, for booking meetings.
+
+Every student's classes in the date range are rasterised into fixed-size slots
+(30 minutes by default) within the meeting hours of each day, and stored as one
+packed NumPy bit row per student. A group's busy time is a single OR-reduce over
+its rows; candidate meetings are then ranked by how many members can attend, so
+a cohort of hundreds is answered in milliseconds.
+
+Schedules come from the bot's CSV export: a folder of ``<student>.csv`` files or
+a ``--batch`` output folder (``<student>/SUTD_Schedule.csv``). NumPy is optional
+for the rest of the bot, so it is only imported once a finder is built.
+"""
+
+import csv
+import glob
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sutd_events import ClassEvent, time_to_minutes
+
+SLOT_MINUTES = 30
+DAY_START = 9 * 60     # Meeting hours, minutes after midnight
+DAY_END = 18 * 60
+WEEKDAYS = (0, 1, 2, 3, 4)
+SCHEDULE_CSV = "SUTD_Schedule.csv"
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = None  # Set by _require_numpy()
+
+
+def _require_numpy():
+    """Imports numpy for the finder, with an install hint instead of a bare ModuleNotFoundError."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("The free-slot finder (--free-slots) needs numpy: pip install numpy") from None
+        np = numpy
+
+
+class MeetingSlot(NamedTuple):
+    start: datetime
+    end: datetime
+    available: int          # Group members free for the whole slot
+    missing: List[str]      # Members with a class during it
+
+
+def read_schedule_csv(path: str) -> List[ClassEvent]:
+    """Reads a CSV written by the bot (or --query --export-csv) back into events."""
+    events = []
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            start, end = time_to_minutes(row["Start Time"]), time_to_minutes(row["End Time"])
+            if start is None or end is None:
+                continue
+            events.append(ClassEvent(row["Course Code"], row["Section"], row["Title"], row["Type"],
+                                     date.fromisoformat(row["Date"]), start, end, row["Location"], row["Instructors"]))
+    return events
+
+
+def load_student_csvs(input_dir: str) -> Dict[str, List[ClassEvent]]:
+    """Returns {student: events} for every <student>.csv and <student>/SUTD_Schedule.csv in input_dir."""
+    students = {}
+    for path in sorted(glob.glob(os.path.join(input_dir, "*.csv"))):
+        students[os.path.splitext(os.path.basename(path))[0]] = read_schedule_csv(path)
+    for path in sorted(glob.glob(os.path.join(input_dir, "*", SCHEDULE_CSV))):
+        students[os.path.basename(os.path.dirname(path))] = read_schedule_csv(path)
+    return students
+
+
+class FreeSlotFinder:
+    """Packed busy bits for a set of students over a date range, queried per group."""
+
+    def __init__(self, schedules: Dict[str, Iterable[ClassEvent]], date_from: date, date_to: date,
+                 slot_minutes: int = SLOT_MINUTES, day_start: int = DAY_START, day_end: int = DAY_END,
+                 weekdays: Sequence[int] = WEEKDAYS):
+        _require_numpy()
+        self.slot_minutes = slot_minutes
+        self.day_start = day_start
+        self.slots_per_day = (day_end - day_start) // slot_minutes
+        self.days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)
+                     if (date_from + timedelta(days=i)).weekday() in weekdays]
+        self.students = list(schedules)
+        self.index = {student: i for i, student in enumerate(self.students)}
+
+        # 1. Every class as (student row, first slot, end slot), clipped to meeting hours
+        day_index = {day: i for i, day in enumerate(self.days)}
+        rows, firsts, ends = [], [], []
+        for row, events in enumerate(schedules.values()):
+            for ev in events:
+                d = day_index.get(ev.date)
+                if d is None:
+                    continue
+                first = max((ev.start - day_start) // slot_minutes, 0)
+                end = min(-(-(ev.end - day_start) // slot_minutes), self.slots_per_day)  # Ceiling: partly busy is busy
+                if first < end:
+                    base = d * self.slots_per_day
+                    rows.append(row)
+                    firsts.append(base + first)
+                    ends.append(base + end)
+
+        # 2. Rasterise all of them at once with a difference array, then pack 8 slots per byte
+        total = len(self.days) * self.slots_per_day
+        diff = np.zeros((len(self.students), total + 1), dtype=np.int32)
+        np.add.at(diff, (np.array(rows, dtype=np.intp), np.array(firsts, dtype=np.intp)), 1)
+        np.add.at(diff, (np.array(rows, dtype=np.intp), np.array(ends, dtype=np.intp)), -1)
+        busy = np.cumsum(diff[:, :total], axis=1) > 0
+        self.total_slots = total
+        self.busy_bits = np.packbits(busy, axis=1)
+
+    def group_busy(self, group: Sequence[str]) -> 'np.ndarray':
+        """OR of the group's busy bits, unpacked to one bool per slot."""
+        rows = self.busy_bits[[self.index[student] for student in group]]
+        return np.unpackbits(np.bitwise_or.reduce(rows, axis=0), count=self.total_slots).astype(bool)
+
+    def find_slots(self, group: Optional[Sequence[str]] = None, duration_minutes: int = 60, top_n: int = 5,
+                   min_available: int = 1) -> List[MeetingSlot]:
+        """The top_n non-overlapping meeting slots for the group: everyone free first, then most members free, earliest first."""
+        if duration_minutes <= 0:
+            raise ValueError(f"Meeting duration must be positive, got {duration_minutes} minutes")
+        group = list(group) if group else self.students
+        unknown = [student for student in group if student not in self.index]
+        if unknown:
+            raise KeyError(f"No schedule for: {', '.join(unknown)}")
+        length = -(-duration_minutes // self.slot_minutes)
+        if length > self.slots_per_day or not self.days:
+            return []
+
+        # 1. Windows where nobody in the group has class: one OR-reduce over the packed rows
+        all_free = self._window_free(~self.group_busy(group)[None, :], length)[0]
+        picks = self._pick(all_free * len(group), length, top_n, min_available)
+        if len(picks) == top_n or len(group) == 1:
+            return [self._meeting(window, length, len(group), []) for window in picks]
+
+        # 2. Not enough of those: rank every window by how many members are free for all of it
+        rows = self.busy_bits[[self.index[student] for student in group]]
+        member_free = self._window_free(~np.unpackbits(rows, axis=1, count=self.total_slots).astype(bool), length)
+        available = member_free.sum(axis=0)
+        picks = self._pick(available, length, top_n, min_available)
+        return [self._meeting(window, length, available[window],
+                              [student for student, free in zip(group, member_free[:, window]) if not free])
+                for window in picks]
+
+    def _window_free(self, free: 'np.ndarray', length: int) -> 'np.ndarray':
+        """For each row, whether each same-day window of `length` slots is entirely free. Shape (rows, days * windows per day)."""
+        per_day = self.slots_per_day - length + 1
+        free = free.reshape(free.shape[0], len(self.days), self.slots_per_day).astype(np.int16)
+        sums = np.cumsum(np.pad(free, ((0, 0), (0, 0), (1, 0))), axis=2)
+        return ((sums[:, :, length:] - sums[:, :, :per_day]) == length).reshape(free.shape[0], -1)
+
+    def _window_start(self, window: int, length: int) -> int:
+        """Converts a window index into its first slot."""
+        day, offset = divmod(int(window), self.slots_per_day - length + 1)
+        return day * self.slots_per_day + offset
+
+    def _pick(self, available: 'np.ndarray', length: int, top_n: int, min_available: int) -> List[int]:
+        """Best windows first (most available, then earliest), skipping any that overlap one already picked."""
+        candidates = np.flatnonzero(available >= max(min_available, 1))
+        order = candidates[np.argsort(-available[candidates], kind='stable')]
+        picks, taken = [], np.zeros(self.total_slots, dtype=bool)
+        for window in order:
+            start = self._window_start(window, length)
+            if taken[start:start + length].any():
+                continue
+            taken[start:start + length] = True
+            picks.append(int(window))
+            if len(picks) == top_n:
+                break
+        return picks
+
+    def _meeting(self, window: int, length: int, available: int, missing: List[str]) -> MeetingSlot:
+        start = self._window_start(window, length)
+        day = self.days[start // self.slots_per_day]
+        begin = datetime.combine(day, datetime.min.time()) + timedelta(minutes=self.day_start + (start % self.slots_per_day) * self.slot_minutes)
+        return MeetingSlot(begin, begin + timedelta(minutes=length * self.slot_minutes), int(available), missing)
+
+
+def run_free_slots(input_dir: str, date_from: date, date_to: date, group: Optional[Sequence[str]] = None,
+                   duration_minutes: int = 60, top_n: int = 5) -> int:
+    """The --free-slots command: loads the cohort's CSVs and prints the best meeting slots for the group."""
+    schedules = load_student_csvs(input_dir)
+    if not schedules:
+        raise FileNotFoundError(f"No schedules (*.csv or */{SCHEDULE_CSV}) in {input_dir}")
+    unknown = [student for student in group or [] if student not in schedules]
+    if unknown:
+        print(f"No schedule for: {', '.join(unknown)}")
+        print(f"Available students: {', '.join(sorted(schedules))}")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        finder = FreeSlotFinder(schedules, date_from, date_to)
+    except ImportError as e:
+        print(e)
+        return 1
+    built = time.perf_counter()
+    slots = finder.find_slots(group, duration_minutes=duration_minutes, top_n=top_n)
+    elapsed = time.perf_counter() - built
+
+    size = len(group) if group else len(schedules)
+    print(f"Best {duration_minutes}-minute slots for {size} students, {date_from:%d %b} - {date_to:%d %b}:")
+    for slot in slots:
+        missing = f"  (missing: {', '.join(slot.missing)})" if slot.missing else ""
+        print(f"  {slot.start:%a %d %b %H:%M}-{slot.end:%H:%M}  {slot.available}/{size} free{missing}")
+    if not slots:
+        print("  No slot fits inside meeting hours.")
+    print(f"Rasterised {len(schedules)} schedules in {(built - start) * 1000:.1f} ms, searched in {elapsed * 1000:.1f} ms.")
+    return 0
@@ -0,0 +1,260 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Selenium-free parser for the PeopleSoft Weekly Schedule grid.
+
+Takes the HTML of the schedule iframe (``driver.page_source``) and returns the
+same ``(courses_list, all_events)`` structures as ``SUTDCalendarBot.scrape_calendar_grid``.
+Day columns are resolved from the table structure (rowspan/colspan) instead of
+on-screen geometry, so nothing here needs a browser.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import lxml.html
+
+from sutd_events import ClassEvent, time_to_minutes
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+TIME_RANGE_RE = re.compile(r'(?P<start>\d{1,2}:\d{2}[AP]M)\s*-\s*(?P<end>\d{1,2}:\d{2}[AP]M)')
+WEEK_OF_RE = re.compile(r"Week of\s*(\d{1,2}/\d{1,2}/\d{4})")
+CODE_SECTION_RE = re.compile(r'(?P<code>\d{2}\s*\.\d{3})\s*-\s*(?P<section>\w+)')
+TIME_CONFLICT_RE = re.compile(r'\bTime Conflict\b', re.IGNORECASE)
+
+# Elements that start a new line in the browser's innerText rendering
+BLOCK_TAGS = {'div', 'p', 'tr', 'table', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+WHITESPACE_RE = re.compile(r'[ \t\r\n]+')
+
+# Distinct cell texts kept by the parser cache (a term has a few dozen; pages from many students need more)
+CELL_CACHE_SIZE = 4096
+
+
+class CellSession(NamedTuple):
+    """One class session parsed from a grid cell, before a date is attached. Times are minutes after midnight."""
+    code: str
+    section: str
+    title: str
+    type: str
+    start: int
+    end: int
+    location: str
+    instructors: str
+
+
+@lru_cache(maxsize=CELL_CACHE_SIZE)
+def _parse_cell_sessions(cell_text: str) -> Tuple[CellSession, ...]:
+    """Parses a cell's text once; recurring classes render byte-identical text every week so this is cached."""
+    sessions = []
+    for chunk in TIME_CONFLICT_RE.split(cell_text):
+        lines = [line for line in (raw.strip() for raw in chunk.split('\n')) if line]
+
+        # Find the time line to anchor our parsing (need Code/Section and Type above it)
+        time_line_idx, time_match = -1, None
+        for idx, line in enumerate(lines):
+            time_match = TIME_RANGE_RE.search(line)
+            if time_match:
+                time_line_idx = idx
+                break
+        if time_line_idx < 2:
+            continue
+
+        # Extract Code & Section (Line 0)
+        code_sec_match = CODE_SECTION_RE.match(lines[0])
+        if not code_sec_match: continue
+
+        # Extract Times (skip anything that isn't a real clock time)
+        start, end = time_to_minutes(time_match.group('start')), time_to_minutes(time_match.group('end'))
+        if start is None or end is None: continue
+
+        # Extract Type and Title
+        ctype = lines[time_line_idx - 1]
+        title = " ".join(lines[1:time_line_idx - 1]) if time_line_idx > 2 else "Unknown Course"
+
+        # Extract Location & Instructors
+        location = lines[time_line_idx + 1] if time_line_idx + 1 < len(lines) else "Unknown Location"
+
+        instructors_str = " ".join(lines[time_line_idx + 2:])
+        if "Instructors:" in instructors_str:
+            instructors_str = instructors_str.replace("Instructors:", "").strip()
+            instructors_str = ", ".join([i.strip() for i in instructors_str.split(',') if i.strip()])
+        elif not instructors_str:
+            instructors_str = "Staff"
+
+        sessions.append(CellSession(
+            code=code_sec_match.group('code').replace(' ', ''),
+            section=code_sec_match.group('section'),
+            title=title,
+            type=ctype,
+            start=start,
+            end=end,
+            location=location,
+            instructors=instructors_str,
+        ))
+    return tuple(sessions)
+
+
+def parse_cell_text(cell_text: str, on_date: date) -> List[ClassEvent]:
+    """Splits a grid cell on 'Time Conflict' and returns one ClassEvent per session, dated on_date."""
+    return [ClassEvent(*session[:4], on_date, *session[4:]) for session in _parse_cell_sessions(cell_text)]
+
+
+def cell_cache_stats() -> Dict:
+    """Hit/miss counts for the shared cell-text cache."""
+    info = _parse_cell_sessions.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+
+def reset_cell_cache():
+    _parse_cell_sessions.cache_clear()
+
+
+def parse_week_start(text: str) -> Optional[date]:
+    """Finds the 'Week of D/M/YYYY' label and returns it as a date."""
+    week_match = WEEK_OF_RE.search(text)
+    if not week_match:
+        return None
+    return datetime.strptime(week_match.group(1), "%d/%m/%Y").date()
+
+
+def inner_text(element) -> str:
+    """Approximates the browser's innerText: collapses source whitespace, breaks lines on <br> and block elements."""
+    parts = []
+
+    def walk(node):
+        if not isinstance(node.tag, str) or node.tag in ('script', 'style'):
+            return
+        if node.tag == 'br':
+            parts.append('\n')
+        elif node.tag in BLOCK_TAGS:
+            parts.append('\n')
+        if node.text:
+            parts.append(WHITESPACE_RE.sub(' ', node.text))
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(WHITESPACE_RE.sub(' ', child.tail))
+        if node.tag in BLOCK_TAGS:
+            parts.append('\n')
+
+    walk(element)
+    return ''.join(parts)
+
+
+def _table_rows(table) -> List:
+    """Rows belonging to this table only (not to tables nested inside its cells)."""
+    return table.xpath('./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr')
+
+
+def _span(cell, attr: str) -> int:
+    try:
+        return max(int(cell.get(attr, 1)), 1)
+    except ValueError:
+        return 1
+
+
+def _layout_cells(table) -> Iterable[Tuple[object, int, int]]:
+    """Yields (cell, first_column, colspan) the way a browser places cells, honouring rowspan/colspan."""
+    occupied = set()
+    for row_idx, tr in enumerate(_table_rows(table)):
+        col = 0
+        for cell in tr:
+            if cell.tag not in ('td', 'th'):
+                continue
+            while (row_idx, col) in occupied:
+                col += 1
+            rowspan, colspan = _span(cell, 'rowspan'), _span(cell, 'colspan')
+            for dr in range(rowspan):
+                for dc in range(colspan):
+                    occupied.add((row_idx + dr, col + dc))
+            yield cell, col, colspan
+            col += colspan
+
+
+def _find_grid_table(doc):
+    """The schedule grid is the table whose own header cells name the days of the week."""
+    best, best_count = None, 0
+    for table in doc.iter('table'):
+        headers = table.xpath('./tr/th | ./thead/tr/th | ./tbody/tr/th')
+        count = sum(1 for th in headers if any(day in th.text_content() for day in DAY_NAMES))
+        if count > best_count:
+            best, best_count = table, count
+    return best
+
+
+def parse_week_html(html: str, week_start: Optional[date] = None) -> Tuple[Optional[date], List[ClassEvent]]:
+    """Parses one week's schedule page into (week_start_date, events). Returns (None, []) if it isn't a schedule week."""
+    doc = lxml.html.fromstring(html)
+
+    if week_start is None:
+        week_start = parse_week_start(doc.text_content())
+        if week_start is None:
+            return None, []
+
+    table = _find_grid_table(doc)
+    if table is None:
+        return week_start, []
+
+    # 1. Map each grid column to a day offset using the header row
+    column_days = {}
+    day_idx = 0
+    cells = []
+    for cell, col, colspan in _layout_cells(table):
+        if cell.tag == 'th' and any(day in cell.text_content() for day in DAY_NAMES):
+            for c in range(col, col + colspan):
+                column_days[c] = day_idx
+            day_idx += 1
+        elif cell.tag == 'td':
+            cells.append((cell, col))
+
+    if not column_days:
+        return week_start, []
+
+    # 2. Parse every time-bearing cell and date it by its column
+    events = []
+    for cell, col in cells:
+        cell_text = inner_text(cell).strip()
+        if not TIME_RANGE_RE.search(cell_text):
+            continue
+
+        if col in column_days:
+            day_offset = column_days[col]
+        else:
+            day_offset = column_days[min(column_days, key=lambda c: abs(c - col))]
+        current_date = week_start + timedelta(days=day_offset)
+
+        events.extend(parse_cell_text(cell_text, current_date))
+
+    return week_start, events
+
+
+def build_courses_summary(events: Iterable[ClassEvent]) -> List[Dict]:
+    """Builds the per-course summary used by the selection UI: code, first-seen title and the set of types."""
+    courses_summary = {}
+    for event in events:
+        code, ctype = event.code, event.type
+        if code not in courses_summary:
+            courses_summary[code] = {'code': code, 'name': event.title, 'type': {}}
+        if ctype not in courses_summary[code]['type']:
+            courses_summary[code]['type'][ctype] = True
+    return list(courses_summary.values())
+
+
+def parse_schedule_pages(pages: Iterable[str]) -> Tuple[List[Dict], List[ClassEvent]]:
+    """Parses a sequence of weekly schedule pages into (courses_list, all_events)."""
+    all_events = []
+    for html in pages:
+        _, week_events = parse_week_html(html)
+        all_events.extend(week_events)
+    return build_courses_summary(all_events), all_events
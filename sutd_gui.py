@@ -0,0 +1,635 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""The CustomTkinter app. Only imported when the window is actually opened, so
+headless runs (--replay, --benchmark, ...) never load Tk."""
+
+import os
+import json
+import math
+import logging
+import queue
+import subprocess
+import threading
+from typing import Dict, List
+
+import customtkinter as ctk
+from tkinter import messagebox
+
+from sutd_calendar_bot import CONFIG_FILE, DESKTOP_PATH, TYPE_MAPPING, ExportCancelled, SUTDCalendarBot
+from sutd_events import dedupe_events, conflict_side_key, resolve_conflicts
+from sutd_snapshots import SnapshotRecorder
+
+
+LOG_DRAIN_MS = 16       # How often queued log messages are flushed to the log box (about once per frame)
+LOG_MAX_LINES = 500     # Scrollback kept in the log box; older lines are dropped
+ROW_HEIGHT = 84         # Pixel height of one course row in the selection list
+
+
+def apply_theme():
+    ctk.set_appearance_mode("System")
+    ctk.set_default_color_theme("blue")
+
+
+class CourseRow:
+    """Selection state for one course: the (editable) display name and which class types to export."""
+    __slots__ = ('code', 'default_name', 'name', 'types')
+
+    def __init__(self, code: str, default_name: str, name: str, types: List[str]):
+        self.code = code
+        self.default_name = default_name
+        self.name = name
+        self.types: Dict[str, bool] = {type_code: True for type_code in types}
+
+
+class CourseRowWidget(ctk.CTkFrame):
+    """One on-screen row. It is re-bound to whichever CourseRow scrolls into its slot instead of being rebuilt."""
+
+    def __init__(self, parent):
+        super().__init__(parent, height=ROW_HEIGHT - 10)
+        self.pack_propagate(False)  # Fixed height, so rows can be positioned arithmetically
+        self.row = None
+        self._binding = False
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=5, pady=5)
+        self.code_lbl = ctk.CTkLabel(header, text="", font=("Roboto", 12, "bold"), text_color="gray", width=60, anchor="w")
+        self.code_lbl.pack(side="left")
+        self.name_var = ctk.StringVar()
+        self.name_var.trace_add("write", self._on_name_edit)
+        ctk.CTkEntry(header, textvariable=self.name_var, height=28).pack(side="left", fill="x", expand=True, padx=10)
+
+        self.chk_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.chk_frame.pack(fill="x", padx=10, pady=5)
+        self.checkboxes = []  # Grown on demand, hidden when a course has fewer types
+
+    def bind_row(self, row: CourseRow):
+        self._binding = True
+        self.row = row
+        self.code_lbl.configure(text=row.code)
+        if self.name_var.get() != row.name:
+            self.name_var.set(row.name)
+
+        type_codes = list(row.types)
+        while len(self.checkboxes) < len(type_codes):
+            var = ctk.BooleanVar()
+            chk = ctk.CTkCheckBox(self.chk_frame, text="", variable=var)
+            chk.configure(command=lambda idx=len(self.checkboxes): self._on_toggle(idx))
+            self.checkboxes.append((chk, var))
+        for idx, (chk, var) in enumerate(self.checkboxes):
+            if idx < len(type_codes):
+                type_code = type_codes[idx]
+                chk.configure(text=str(TYPE_MAPPING.get(type_code) or type_code))
+                var.set(row.types[type_code])
+                if not chk.winfo_manager():
+                    chk.pack(side="left", padx=10)
+            elif chk.winfo_manager():
+                chk.pack_forget()
+        self._binding = False
+
+    def _on_name_edit(self, *_):
+        if self.row is not None and not self._binding:
+            self.row.name = self.name_var.get()
+
+    def _on_toggle(self, idx: int):
+        if self.row is not None:
+            type_code = list(self.row.types)[idx]
+            self.row.types[type_code] = self.checkboxes[idx][1].get()
+
+
+class CourseListView(ctk.CTkFrame):
+    """Scrollable course list that only creates widgets for the rows that fit on screen.
+
+    Rows are drawn from a pool that is re-bound as the list scrolls and kept across rescans,
+    so the widget count (and render time) depends on the window height, not the course count.
+    """
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.rows: List[CourseRow] = []
+        self.offset = 0  # Pixels scrolled from the top
+        self.pool: List[CourseRowWidget] = []
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.empty_lbl = ctk.CTkLabel(self.viewport, text="No courses found in schedule!", text_color="red")
+
+        self.viewport.bind("<Configure>", lambda e: self._render())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind_all(sequence, self._on_wheel, add="+")
+
+    def set_rows(self, rows: List[CourseRow]):
+        self.rows = rows
+        self.offset = 0
+        self._render()
+
+    def refresh(self):
+        """Re-binds visible rows after the model changed underneath them (e.g. Select All)."""
+        self._render(rebind=True)
+
+    def _viewport_height(self) -> float:
+        # winfo_height is in screen pixels; ROW_HEIGHT and place() coordinates are scaled by CustomTkinter
+        return self.viewport.winfo_height() / self._get_widget_scaling()
+
+    def _max_offset(self) -> int:
+        return max(0, int(len(self.rows) * ROW_HEIGHT - self._viewport_height()))
+
+    def _scroll_to(self, offset: float):
+        self.offset = int(min(max(offset, 0), self._max_offset()))
+        self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(value) * len(self.rows) * ROW_HEIGHT)
+        elif action == "scroll":
+            step = self._viewport_height() if unit == "pages" else ROW_HEIGHT
+            self._scroll_to(self.offset + int(value) * step)
+
+    def _on_wheel(self, event):
+        # Only scroll when the pointer is over this list
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        while widget is not None and widget is not self:
+            widget = widget.master
+        if widget is None:
+            return
+        if event.num == 4 or event.delta > 0:
+            self._scroll_to(self.offset - ROW_HEIGHT // 2)
+        else:
+            self._scroll_to(self.offset + ROW_HEIGHT // 2)
+
+    def _render(self, rebind: bool = False):
+        height = max(self._viewport_height(), 1)
+        if not self.rows:
+            for widget in self.pool:
+                widget.place_forget()
+            self.empty_lbl.place(relx=0.5, y=20, anchor="n")
+            self.scrollbar.set(0, 1)
+            return
+        self.empty_lbl.place_forget()
+
+        # 1. Grow the pool to cover the viewport (plus one partially visible row); never shrink it
+        needed = min(len(self.rows), math.ceil(height / ROW_HEIGHT) + 1)
+        while len(self.pool) < needed:
+            self.pool.append(CourseRowWidget(self.viewport))
+
+        # 2. Bind pool slots to the rows in view and position them
+        self.offset = min(self.offset, self._max_offset())
+        first = self.offset // ROW_HEIGHT
+        shift = self.offset % ROW_HEIGHT
+        for slot, widget in enumerate(self.pool):
+            index = first + slot
+            if slot < needed and index < len(self.rows):
+                # Scrolling only re-binds slots that now show another row; refresh() re-syncs the checkboxes of all of them
+                if rebind or widget.row is not self.rows[index]:
+                    widget.bind_row(self.rows[index])
+                widget.place(x=0, y=slot * ROW_HEIGHT - shift, relwidth=1.0)
+            else:
+                widget.place_forget()
+
+        total = len(self.rows) * ROW_HEIGHT
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + height) / total))
+
+
+class ConflictDialog(ctk.CTkToplevel):
+    """A custom modal dialog to resolve time conflicts."""
+    def __init__(self, parent, ev1, ev2, occurrences=1):
+        super().__init__(parent)
+        self.title("⚠️ Time Conflict")
+        self.geometry("650x420")
+        self.attributes("-topmost", True)
+        self.choice = None  # Stays None when the window is closed without picking
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Center the window dynamically over the parent application
+        self.update_idletasks()
+        try:
+            x = parent.winfo_x() + (parent.winfo_width() // 2) - (650 // 2)
+            y = parent.winfo_y() + (parent.winfo_height() // 2) - (420 // 2)
+            self.geometry(f"+{x}+{y}")
+        except Exception:
+            pass
+        
+        lbl_warn = ctk.CTkLabel(self, text="⚠️ Time Conflict Detected!", font=("Roboto", 20, "bold"), text_color="#ff9800")
+        lbl_warn.pack(pady=(20, 5))
+        
+        date_str = ev1.date.strftime('%A, %d %b %Y')
+        lbl_info = ctk.CTkLabel(self, text=f"Date: {date_str}\nOverlap near {ev1.start_time} - {ev1.end_time}", font=("Roboto", 14))
+        lbl_info.pack(pady=10)
+
+        if occurrences > 1:
+            ctk.CTkLabel(self, text=f"This clash repeats on {occurrences} dates. Your choice applies to all of them and is remembered.",
+                         font=("Roboto", 12), text_color="gray").pack()
+        
+        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
+        btn_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        # --- Class A Card ---
+        frame_a = ctk.CTkFrame(btn_frame)
+        frame_a.pack(side="left", fill="both", expand=True, padx=10)
+        ctk.CTkLabel(frame_a, text="OPTION A", font=("Roboto", 12, "bold"), text_color="gray").pack(pady=(10, 0))
+        ctk.CTkLabel(frame_a, text=f"{ev1.code} - {ev1.section}", font=("Roboto", 14, "bold")).pack()
+        ctk.CTkLabel(frame_a, text=f"{ev1.title}", font=("Roboto", 12), wraplength=250).pack(pady=5)
+        ctk.CTkLabel(frame_a, text=f"{ev1.type}\n{ev1.start_time} - {ev1.end_time}\n{ev1.location}", font=("Roboto", 12)).pack(pady=5)
+        
+        btn_a = ctk.CTkButton(frame_a, text="Keep Class A", command=lambda: self.set_choice('ev1'), fg_color="#2ecc71", hover_color="#27ae60")
+        btn_a.pack(pady=15, side="bottom")
+        
+        # --- Class B Card ---
+        frame_b = ctk.CTkFrame(btn_frame)
+        frame_b.pack(side="right", fill="both", expand=True, padx=10)
+        ctk.CTkLabel(frame_b, text="OPTION B", font=("Roboto", 12, "bold"), text_color="gray").pack(pady=(10, 0))
+        ctk.CTkLabel(frame_b, text=f"{ev2.code} - {ev2.section}", font=("Roboto", 14, "bold")).pack()
+        ctk.CTkLabel(frame_b, text=f"{ev2.title}", font=("Roboto", 12), wraplength=250).pack(pady=5)
+        ctk.CTkLabel(frame_b, text=f"{ev2.type}\n{ev2.start_time} - {ev2.end_time}\n{ev2.location}", font=("Roboto", 12)).pack(pady=5)
+        
+        btn_b = ctk.CTkButton(frame_b, text="Keep Class B", command=lambda: self.set_choice('ev2'), fg_color="#3498db", hover_color="#2980b9")
+        btn_b.pack(pady=15, side="bottom")
+        
+        # --- Keep Both Button ---
+        btn_both = ctk.CTkButton(self, text="Keep Both (Ignore)", command=lambda: self.set_choice('both'), fg_color="gray", hover_color="#555")
+        btn_both.pack(pady=15)
+        
+        # Make the window modal to intercept user interaction
+        self.grab_set()
+
+    def set_choice(self, choice):
+        self.choice = choice
+        self.grab_release()
+        self.destroy()
+
+    def on_close(self):
+        # Closing via 'X' keeps both for this run without remembering a choice
+        self.set_choice(None)
+
+
+class CalendarApp(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+        self.title("SUTD Schedule Export")
+        self.geometry("750x850") 
+        
+        self.bot = SUTDCalendarBot(log_callback=self.update_log)
+        self.courses_data = []
+        self.all_events = [] # Stores all raw scheduled sessions across the term
+        
+        self.course_rows: List[CourseRow] = []  # Selection model behind the virtualized course list
+        self.config_data = self.load_config() 
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1) 
+
+        # 1. HEADER
+        self.header_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
+        self.header_frame.grid(row=0, column=0, sticky="ew", padx=20, pady=(20, 10))
+        
+        self.title_lbl = ctk.CTkLabel(self.header_frame, text="SUTD CALENDAR BOT", font=("Roboto Medium", 20))
+        self.title_lbl.pack(side="left")
+        
+        self.subtitle_lbl = ctk.CTkLabel(self.header_frame, text="Smart .ics & .csv Generator", font=("Roboto", 12), text_color="gray")
+        self.subtitle_lbl.pack(side="left", padx=10, pady=(8,0))
+
+        # 2. CONTROL PANEL
+        self.ctrl_frame = ctk.CTkFrame(self)
+        self.ctrl_frame.grid(row=1, column=0, sticky="ew", padx=20, pady=5)
+        
+        self.instr_lbl = ctk.CTkLabel(self.ctrl_frame, 
+                                      text="STEP 1: Click 'Start Login & Scan' to begin.", 
+                                      font=("Roboto", 14), anchor="w")
+        self.instr_lbl.pack(fill="x", padx=15, pady=(15, 5))
+
+        self.start_btn = ctk.CTkButton(self.ctrl_frame, text="START LOGIN & SCAN", 
+                                       command=self.start_process, 
+                                       font=("Roboto", 12, "bold"), height=40)
+        self.start_btn.pack(side="left", padx=15, pady=15)
+
+        saved_remember = self.config_data.get("settings", {}).get("remember_login", False)
+        self.remember_var = ctk.BooleanVar(value=saved_remember)
+        self.remember_chk = ctk.CTkCheckBox(self.ctrl_frame, text="Remember login", variable=self.remember_var)
+        self.remember_chk.pack(side="left")
+
+        self.status_lbl = ctk.CTkLabel(self.ctrl_frame, text="Ready", text_color="gray")
+        self.status_lbl.pack(side="left", padx=15)
+
+        # 3. LIST FRAME (Scrollable)
+        self.list_lbl_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.list_lbl_frame.grid(row=2, column=0, sticky="nsew", padx=20, pady=5)
+        
+        self.list_header = ctk.CTkFrame(self.list_lbl_frame, height=30, fg_color="transparent")
+        self.list_header.pack(fill="x")
+        ctk.CTkLabel(self.list_header, text="DETECTED COURSES", font=("Roboto", 12, "bold")).pack(side="left")
+        
+        self.btn_all = ctk.CTkButton(self.list_header, text="Select All", width=60, height=20, font=("Roboto", 10), command=lambda: self.toggle_all(True))
+        self.btn_all.pack(side="right", padx=5)
+        self.btn_none = ctk.CTkButton(self.list_header, text="Select None", width=60, height=20, font=("Roboto", 10), command=lambda: self.toggle_all(False))
+        self.btn_none.pack(side="right")
+
+        self.course_list = CourseListView(self.list_lbl_frame)
+        self.course_list.pack(fill="both", expand=True)
+
+        # 4. SETTINGS & GENERATE
+        self.bottom_frame = ctk.CTkFrame(self)
+        self.bottom_frame.grid(row=3, column=0, sticky="ew", padx=20, pady=20)
+
+        ctk.CTkLabel(self.bottom_frame, text="Reminder (min):").pack(side="left", padx=(15, 5))
+        
+        saved_reminder = self.config_data.get("settings", {}).get("default_reminder", 15)
+        self.reminder_var = ctk.StringVar(value=str(saved_reminder))
+        self.rem_entry = ctk.CTkEntry(self.bottom_frame, textvariable=self.reminder_var, width=50)
+        self.rem_entry.pack(side="left")
+
+        saved_recurring = self.config_data.get("settings", {}).get("recurring_ics", False)
+        self.recurring_var = ctk.BooleanVar(value=saved_recurring)
+        self.recurring_chk = ctk.CTkCheckBox(self.bottom_frame, text="Weekly repeats", variable=self.recurring_var)
+        self.recurring_chk.pack(side="left", padx=(15, 0))
+
+        self.gen_btn = ctk.CTkButton(self.bottom_frame, text="GENERATE CSV & ICS FILES", 
+                                     command=self.generate_files, 
+                                     font=("Roboto", 14, "bold"), 
+                                     height=50, state="disabled")
+        self.gen_btn.pack(side="right", padx=15, pady=15, fill="x", expand=True)
+
+        # Shown next to the button only while files are being written
+        self.export_progress = ctk.CTkProgressBar(self.bottom_frame)
+        self.export_fraction = None  # Latest progress from the export thread, shown by the next drain
+        self.export_cancel = threading.Event()
+        
+        # 5. LOG BOX
+        self.log_box = ctk.CTkTextbox(self, height=80, font=("Consolas", 10))
+        self.log_box.grid(row=4, column=0, sticky="ew", padx=20, pady=(0, 20))
+        self.log_box.insert("0.0", "System Ready. Config loaded.\n")
+
+        # Messages from any thread are queued and drained in batches on the Tk thread
+        self.log_queue = queue.SimpleQueue()
+        self.after(LOG_DRAIN_MS, self._drain_log)
+
+    def load_config(self):
+        if os.path.exists(CONFIG_FILE):
+            try:
+                with open(CONFIG_FILE, 'r') as f:
+                    return json.load(f)
+            except Exception:
+                return {}
+        return {}
+
+    def save_config(self, processed_courses, reminder_val, recurring=False):
+        config = self.config_data
+        
+        if "settings" not in config: config["settings"] = {}
+        config["settings"]["default_reminder"] = reminder_val
+        config["settings"]["recurring_ics"] = recurring
+
+        if "courses" not in config: config["courses"] = {}
+        for c in processed_courses:
+            config["courses"][c['code']] = {
+                "custom_name": c['name'],
+            }
+            
+        if self._write_config():
+            self.update_log("Preferences saved.")
+
+    def _write_config(self):
+        try:
+            with open(CONFIG_FILE, 'w') as f:
+                json.dump(self.config_data, f, indent=4)
+            return True
+        except Exception as e:
+            self.update_log(f"Failed to save config: {e}")
+            return False
+
+    def update_log(self, message):
+        """Thread-safe: queues the message for the next drain instead of scheduling a Tk callback per line."""
+        self.log_queue.put(message)
+
+    def _drain_log(self):
+        """Appends everything queued since the last frame in one insert, then trims the scrollback."""
+        messages = []
+        try:
+            while True:
+                messages.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        # The export thread only stores its progress; the bar is touched here, on the Tk thread
+        fraction, self.export_fraction = self.export_fraction, None
+        if fraction is not None:
+            self.export_progress.set(fraction)
+
+        if messages:
+            self.status_lbl.configure(text=messages[-1])
+            self.log_box.insert("end", "".join(f"> {message}\n" for message in messages))
+            excess = int(self.log_box.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+            if excess > 0:
+                self.log_box.delete("1.0", f"{excess + 1}.0")
+            self.log_box.see("end")
+
+        self.after(LOG_DRAIN_MS, self._drain_log)
+
+    def start_process(self):
+        self.start_btn.configure(state="disabled")
+        self.bot.remember_login = self.remember_var.get()
+        self.config_data.setdefault("settings", {})["remember_login"] = self.bot.remember_login
+        self._write_config()
+        threading.Thread(target=self.run_selenium_task, daemon=True).start()
+
+    def run_selenium_task(self):
+        try:
+            self.bot.start_browser()
+            self.bot.login_and_prepare_grid()
+            courses, all_events = self.bot.scrape_calendar_grid()
+            self.bot.close()
+            
+            try:
+                self.after(0, lambda: self.state('zoomed'))
+            except: pass
+
+            # Intecept with the conflict resolver instead of going straight to the UI
+            self.after(0, self.start_conflict_resolution, courses, all_events)
+        except Exception as e:
+            logging.error(f"Selenium Task Error: {e}", exc_info=True)
+            message = str(e)
+            if self.bot.checkpoint_path and self.bot.user and os.path.exists(self.bot.checkpoint_path):
+                message += "\n\nThe weeks scanned so far are saved. Press Start again to continue from where it stopped."
+            self.after(0, messagebox.showerror, "Error", message)
+            self.after(0, self.reset_ui)
+            if self.bot.driver: self.bot.close()
+
+    def start_conflict_resolution(self, courses, all_events):
+        self.courses_data = courses
+        self.all_events = all_events
+        
+        # 1. Deduplicate the raw scrape first to prevent false alarms
+        perf, profiling = self.bot.perf, self.bot.profile_path is not None
+        with perf.span("dedup"), perf.profiling(profiling):
+            self.all_events = dedupe_events(self.all_events)
+
+        # 2. Find every clash in one sweep per day and ask once per distinct weekly clash
+        # Saved decisions: {rule key: side key of the class to keep, or "both"}
+        rules = self.config_data.setdefault("conflict_rules", {})
+
+        def ask(ev1, ev2, occurrences):
+            self.update_log(f"Resolving clash: {ev1.code} vs {ev2.code} ({occurrences} dates)")
+
+            # Spawn modal and wait for user response
+            dialog = ConflictDialog(self, ev1, ev2, occurrences=occurrences)
+            self.wait_window(dialog)
+
+            if dialog.choice == 'ev1':
+                return conflict_side_key(ev1)
+            if dialog.choice == 'ev2':
+                return conflict_side_key(ev2)
+            return "both" if dialog.choice == 'both' else None
+
+        with perf.span("conflict_resolution"), perf.profiling(profiling):
+            self.all_events, stats = resolve_conflicts(self.all_events, rules, ask=ask)
+        if stats['prompts']:
+            self._write_config()
+        if stats['clashes']:
+            self.update_log(f"Resolved {stats['clashes']} distinct clashes with {stats['prompts']} prompts, removed {stats['removed']} sessions.")
+
+        # 3. Finished resolving! Proceed to normal selection UI
+        self.show_selection_ui(self.courses_data, self.all_events)
+
+    def show_selection_ui(self, courses, all_events):
+        self.courses_data = courses
+        self.all_events = all_events
+        self.start_btn.configure(text="RESCAN", state="normal", fg_color="#333")
+        self.gen_btn.configure(state="normal")
+        
+        instructions = (
+            "STEP 2: CUSTOMIZE\n"
+            "• Rename: Edit text boxes.\n"
+            "• Filter: Uncheck unwanted classes.\n"
+            "• Finalize: Click Generate."
+        )
+        self.instr_lbl.configure(text=instructions)
+
+        self.update_log("Review courses and generate.")
+
+        saved_courses = self.config_data.get("courses", {})
+        self.course_rows = [
+            CourseRow(course['code'], course['name'],
+                      saved_courses.get(course['code'], {}).get("custom_name", course['name']),
+                      list(course['type'].keys()))
+            for course in courses
+        ]
+        self.course_list.set_rows(self.course_rows)
+
+        if not courses:
+            self.gen_btn.configure(state="disabled")
+
+    def toggle_all(self, state):
+        for row in self.course_rows:
+            for type_code in row.types:
+                row.types[type_code] = state
+        self.course_list.refresh()
+
+    def generate_files(self):
+        perf, profiling = self.bot.perf, self.bot.profile_path is not None
+        filtered_events = []
+
+        # 1. Index the rows once: course code -> row, plus the set of checked (code, type) pairs
+        rows_by_code = {row.code: row for row in self.course_rows}
+        selected = {(row.code, t) for row in self.course_rows for t, checked in row.types.items() if checked}
+
+        # 2. Filter the massive raw events list based on UI selections, one dict/set lookup per event
+        with perf.span("filter"), perf.profiling(profiling):
+            for ev in self.all_events:
+                if (ev.code, ev.type) in selected:
+                    row = rows_by_code[ev.code]
+                    title = row.name or row.default_name
+                    filtered_events.append(ev if ev.title == title else ev.with_title(title))
+
+        if not filtered_events:
+            messagebox.showwarning("Nothing Selected", "Tick at least one class type to export.")
+            return
+        self.update_log(f"Processing {len(filtered_events)} class sessions...")
+
+        try:
+            rem_mins = int(self.reminder_var.get())
+        except ValueError:
+            rem_mins = 15
+
+        # 3. Save configs (Tk variables and the config file stay on this thread)
+        processed_courses = [{'code': row.code, 'name': row.name or row.default_name} for row in self.course_rows]
+        recurring = self.recurring_var.get()
+        self.save_config(processed_courses, rem_mins, recurring)
+
+        # 4. Write the files on a worker thread so the window keeps painting; the button becomes Cancel
+        self.export_cancel = threading.Event()
+        self.start_btn.configure(state="disabled")
+        self.gen_btn.configure(text="CANCEL", command=self.cancel_export)
+        self.export_fraction = None
+        self.export_progress.set(0)
+        self.export_progress.pack(side="left", padx=(15, 0), fill="x", expand=True)
+        threading.Thread(target=self.run_export_task, args=(filtered_events, rem_mins, recurring), daemon=True).start()
+
+    def run_export_task(self, events, reminder_minutes, recurring):
+        error = None
+        try:
+            with self.bot.perf.profiling(self.bot.profile_path is not None):
+                self.bot.generate_outputs(events, reminder_minutes=reminder_minutes, recurring=recurring,
+                                          progress=self._set_export_fraction,
+                                          cancel_event=self.export_cancel)
+            self.bot.log_perf_summary()
+        except ExportCancelled as e:
+            error = e
+        except Exception as e:
+            logging.error(f"Generation Failed: {e}", exc_info=True)
+            error = e
+        self.after(0, self.finish_export, error)
+
+    def _set_export_fraction(self, fraction):
+        """Called on the export thread: just remembers the fraction for _drain_log."""
+        self.export_fraction = fraction
+
+    def cancel_export(self):
+        self.export_cancel.set()
+        self.gen_btn.configure(state="disabled", text="CANCELLING...")
+
+    def finish_export(self, error):
+        self.export_progress.pack_forget()
+        self.start_btn.configure(state="normal")
+        self.gen_btn.configure(state="normal", text="GENERATE CSV & ICS FILES", command=self.generate_files)
+
+        if isinstance(error, ExportCancelled):
+            self.update_log("Export cancelled. Previous files were left as they were.")
+            return
+        if error is not None:
+            messagebox.showerror("Generation Error", str(error))
+            return
+
+        self.withdraw()
+        output_dir = DESKTOP_PATH
+        if os.name == 'nt':
+            os.startfile(output_dir)
+        elif os.name == 'posix':
+            try:
+                subprocess.call(['open', output_dir])
+            except:
+                pass
+
+        messagebox.showinfo("Success", f"Calendar files generated successfully!\n\nSaved to:\n{output_dir}")
+        self.destroy()
+
+    def reset_ui(self):
+        self.start_btn.configure(state="normal")
+
+
+def launch_app(args):
+    """Opens the main window with the command-line options applied to its bot."""
+    apply_theme()
+    app = CalendarApp()
+    app.bot.portal_url = args.portal_url
+    app.bot.http_weeks = not args.browser_paging
+    app.bot.date_range = (args.date_from, args.date_to)
+    app.bot.max_empty_weeks = args.max_empty_weeks
+    app.bot.profile_path = args.profile
+    app.bot.store_path = args.store
+    if args.record:
+        app.bot.recorder = SnapshotRecorder(args.record)
+    app.mainloop()
@@ -0,0 +1,133 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Fetches Weekly Schedule pages over plain HTTP, reusing the browser's login.
+
+Once Selenium has signed in and opened the schedule, the component form (win0)
+and the session cookies are copied into a pooled ``requests.Session``. Each week
+is then one POST of that form with the week start date filled in and ICAction
+set to Refresh Calendar, which is what PeopleSoft receives when the button is
+clicked. PeopleSoft only honours a POST carrying the latest ICStateNum, so the
+POSTs go out one at a time, each with the number from the previous response,
+while the HTML parsing of earlier weeks carries on in a small thread pool. No
+page has to be rendered.
+"""
+
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from sutd_events import ClassEvent
+from sutd_grid_parser import parse_week_html
+
+if TYPE_CHECKING:
+    import requests
+
+REFRESH_ACTION = "DERIVED_CLASS_S_SSR_REFRESH_CAL$38$"
+START_DATE_FIELD = "DERIVED_CLASS_S_START_DT"
+DISPLAY_FIELDS = ("DERIVED_CLASS_S_SSR_DISP_TITLE", "DERIVED_CLASS_S_SHOW_INSTR")
+HTTP_WORKERS = 4      # Concurrent week requests (kept small; it is one student's session)
+HTTP_TIMEOUT = 15     # Seconds per week request
+HTTP_RETRIES = 2      # Extra attempts for a single week before the whole fetch gives up
+
+STATE_NUM_RE = re.compile(r"""<input[^>]*\bname=['"]?ICStateNum['"]?[^>]*\bvalue=['"]?(\d+)""", re.I)
+
+# Runs inside the schedule iframe: the form's absolute action URL and every field a submit would send.
+FORM_STATE_JS = """
+const form = document.forms['win0'] || document.querySelector('form');
+if (!form) return null;
+const fields = {};
+for (const el of form.elements) {
+    if (!el.name || el.disabled) continue;
+    if ((el.type === 'checkbox' || el.type === 'radio') && !el.checked) continue;
+    if (el.type === 'button' || el.type === 'submit') continue;
+    fields[el.name] = el.value;
+}
+return {action: form.action, fields: fields, user_agent: navigator.userAgent};
+"""
+
+
+def format_ps_date(day: date) -> str:
+    """PeopleSoft's D/M/YYYY date format, as shown in the 'Week of' label."""
+    return f"{day.day}/{day.month}/{day.year}"
+
+
+def session_from_driver(driver, user_agent: Optional[str] = None, pool_size: int = HTTP_WORKERS) -> 'requests.Session':
+    """Builds a requests.Session carrying the browser's cookies, with a connection pool sized for the worker count."""
+    import requests  # Only needed once a browser session exists, so kept off the startup path
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if user_agent:
+        session.headers['User-Agent'] = user_agent
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'))
+    return session
+
+
+class WeekFetcher:
+    """Replays the schedule component's Refresh Calendar POST for arbitrary weeks."""
+
+    def __init__(self, session: 'requests.Session', action_url: str, form_fields: Dict[str, str], max_workers: int = HTTP_WORKERS):
+        self.session = session
+        self.action_url = action_url
+        self.form_fields = dict(form_fields)
+        self.max_workers = max_workers
+        self.state_lock = threading.Lock()  # Serialises the POSTs so each one carries the current ICStateNum
+
+    @classmethod
+    def from_driver(cls, driver, max_workers: int = HTTP_WORKERS) -> Optional['WeekFetcher']:
+        """Captures the form and cookies from a driver currently switched into the schedule iframe."""
+        state = driver.execute_script(FORM_STATE_JS)
+        if not state or 'ICStateNum' not in state['fields']:
+            return None
+        session = session_from_driver(driver, state.get('user_agent'), pool_size=max_workers)
+        return cls(session, state['action'], state['fields'], max_workers)
+
+    def week_form(self, week_start: date) -> Dict[str, str]:
+        form = dict(self.form_fields)
+        form['ICAction'] = REFRESH_ACTION
+        form[START_DATE_FIELD] = format_ps_date(week_start)
+        for name in DISPLAY_FIELDS:
+            form[name] = 'Y'
+        return form
+
+    def fetch_week(self, week_start: date) -> str:
+        """Returns the component HTML for the week starting on week_start."""
+        with self.state_lock:
+            response = self.session.post(self.action_url, data=self.week_form(week_start), timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            match = STATE_NUM_RE.search(response.text)
+            if match:
+                self.form_fields['ICStateNum'] = match.group(1)
+        return response.text
+
+    def fetch_weeks(self, week_starts: List[date]) -> List[Tuple[date, str, Optional[date], List[ClassEvent]]]:
+        """Fetches and parses weeks concurrently. Returns (requested, html, parsed_week_start, events) in request order."""
+        def fetch_and_parse(week_start):
+            # A failed week is retried on its own; the other weeks in flight are unaffected
+            for attempt in range(HTTP_RETRIES + 1):
+                try:
+                    html = self.fetch_week(week_start)
+                    break
+                except Exception as e:
+                    if attempt == HTTP_RETRIES:
+                        raise
+                    logging.warning(f"Week of {week_start} failed ({e}), retrying...")
+            parsed_start, events = parse_week_html(html)
+            return week_start, html, parsed_start, events
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(fetch_and_parse, week_starts))
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,236 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Minimal streaming RFC 5545 (iCalendar) writer.
+
+Writes VEVENT/VALARM blocks straight to an open file as they are produced, so
+export time and memory stay flat no matter how many sessions there are. Only the
+properties the bot emits are supported; text values are escaped and every
+content line is folded at 75 octets.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import IO, Dict, Iterable, List, Optional, Tuple
+
+PRODID = "-//SUTD Calendar Bot//EN"
+CRLF = "\r\n"
+MAX_LINE_OCTETS = 75
+UID_DOMAIN = "sutd-calendar-bot"
+UTC_FORMAT = '%Y%m%dT%H%M%SZ'
+MANIFEST_VERSION = 1
+
+
+def get_timezone(name: str):
+    """Resolves an IANA zone name (zoneinfo reads the tzdata package where the OS has no database)."""
+    from zoneinfo import ZoneInfo
+    return ZoneInfo(name)
+
+
+def escape_text(value: str) -> str:
+    """Escapes a TEXT value (RFC 5545 section 3.3.11)."""
+    return (value.replace('\\', '\\\\')
+                 .replace(';', '\\;')
+                 .replace(',', '\\,')
+                 .replace('\r\n', '\\n')
+                 .replace('\n', '\\n'))
+
+
+def fold_line(line: str) -> str:
+    """Folds a content line into 75-octet chunks without splitting a UTF-8 character (RFC 5545 section 3.1)."""
+    if len(line.encode('utf-8')) <= MAX_LINE_OCTETS:
+        return line + CRLF
+
+    parts = []
+    current, size = [], 0
+    limit = MAX_LINE_OCTETS
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(''.join(current))
+            current, size = [], 0
+            limit = MAX_LINE_OCTETS - 1  # continuation lines start with a space
+        current.append(char)
+        size += char_size
+    parts.append(''.join(current))
+    return (CRLF + ' ').join(parts) + CRLF
+
+
+def format_utc(moment: datetime) -> str:
+    """Formats an aware datetime as an iCalendar UTC DATE-TIME (e.g. 20250113T010000Z)."""
+    return moment.astimezone(timezone.utc).strftime(UTC_FORMAT)
+
+
+def parse_utc(value: str) -> datetime:
+    return datetime.strptime(value, UTC_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def stable_uid(*parts) -> str:
+    """Deterministic UID from identifying fields, so re-exports update events instead of duplicating them."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f"{digest[:32]}@{UID_DOMAIN}"
+
+
+class ICSWriter:
+    """Writes a VCALENDAR to an open text file one event at a time. Use as a context manager."""
+
+    def __init__(self, fileobj: IO[str], prodid: str = PRODID):
+        self.fileobj = fileobj
+        self.prodid = prodid
+        self.dtstamp = format_utc(datetime.now(timezone.utc))
+        self.count = 0
+
+    def _line(self, name: str, value: str):
+        self.fileobj.write(fold_line(f"{name}:{value}"))
+
+    def __enter__(self):
+        self._line("BEGIN", "VCALENDAR")
+        self._line("VERSION", "2.0")
+        self._line("PRODID", self.prodid)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._line("END", "VCALENDAR")
+
+    def write_event(self, begin: datetime, end: datetime, summary: str, location: str = "",
+                    description: str = "", reminder_minutes: int = 0, uid: Optional[str] = None,
+                    rrule: Optional[str] = None, exdates: Iterable[datetime] = (),
+                    recurrence_id: Optional[datetime] = None, sequence: int = 0,
+                    status: Optional[str] = None) -> str:
+        """Writes one VEVENT (with an optional display reminder) for a timezone-aware begin/end.
+
+        rrule/exdates turn it into a recurring series; recurrence_id marks it as an override
+        of one instance of the series sharing its uid. sequence/status are used when
+        re-publishing changed or cancelled events. Returns the UID used.
+        """
+        uid = uid or f"{uuid.uuid4()}@sutd-calendar-bot"
+        self._line("BEGIN", "VEVENT")
+        self._line("UID", uid)
+        self._line("DTSTAMP", self.dtstamp)
+        if sequence:
+            self._line("SEQUENCE", str(sequence))
+        if status:
+            self._line("STATUS", status)
+        if recurrence_id is not None:
+            self._line("RECURRENCE-ID", format_utc(recurrence_id))
+        self._line("DTSTART", format_utc(begin))
+        self._line("DTEND", format_utc(end))
+        if rrule:
+            self._line("RRULE", rrule)
+        exdate_values = ",".join(format_utc(moment) for moment in exdates)
+        if exdate_values:
+            self._line("EXDATE", exdate_values)
+        self._line("SUMMARY", escape_text(summary))
+        if location:
+            self._line("LOCATION", escape_text(location))
+        if description:
+            self._line("DESCRIPTION", escape_text(description))
+        if reminder_minutes > 0:
+            self._line("BEGIN", "VALARM")
+            self._line("ACTION", "DISPLAY")
+            self._line("DESCRIPTION", escape_text(summary))
+            self._line("TRIGGER", f"-PT{reminder_minutes}M")
+            self._line("END", "VALARM")
+        self._line("END", "VEVENT")
+        self.count += 1
+        return uid
+
+
+def entry_key(entry: Dict) -> str:
+    """Manifest key for an entry: its UID, plus the instance for recurrence overrides."""
+    recurrence_id = entry.get('recurrence_id')
+    return f"{entry['uid']}#{format_utc(recurrence_id)}" if recurrence_id else entry['uid']
+
+
+def _entry_record(entry: Dict, reminder_minutes: int) -> Dict:
+    """JSON-safe copy of everything written for an entry (enough to re-issue it as a cancellation)."""
+    return {
+        'uid': entry['uid'],
+        'recurrence_id': format_utc(entry['recurrence_id']) if entry.get('recurrence_id') else None,
+        'begin': format_utc(entry['begin']),
+        'end': format_utc(entry['end']),
+        'summary': entry['summary'],
+        'location': entry.get('location', ""),
+        'description': entry.get('description', ""),
+        'rrule': entry.get('rrule'),
+        'exdates': [format_utc(moment) for moment in entry.get('exdates', ())],
+        'reminder_minutes': reminder_minutes,
+    }
+
+
+class ExportManifest:
+    """What the previous export contained, keyed by entry, so the next run can emit only the differences."""
+
+    def __init__(self, path: str, entries: Optional[Dict[str, Dict]] = None):
+        self.path = path
+        self.entries: Dict[str, Dict] = entries or {}
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ExportManifest']:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != MANIFEST_VERSION:
+            return None
+        return cls(path, data.get('entries', {}))
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, indent=1)
+
+    def record(self, entry: Dict, reminder_minutes: int, previous: Optional['ExportManifest']) -> Tuple[str, int]:
+        """Stores an entry and classifies it against the previous export as added/changed/unchanged."""
+        key = entry_key(entry)
+        record = _entry_record(entry, reminder_minutes)
+        content_hash = hashlib.sha1(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()
+
+        old = previous.entries.get(key) if previous else None
+        if old is None:
+            status, sequence = 'added', 0
+        elif old['hash'] == content_hash:
+            status, sequence = 'unchanged', old['sequence']
+        else:
+            status, sequence = 'changed', old['sequence'] + 1
+
+        record.update(hash=content_hash, sequence=sequence)
+        self.entries[key] = record
+        return status, sequence
+
+    def cancelled_since(self, previous: 'ExportManifest') -> List[Dict]:
+        """Entries from the previous export that are gone now, ready to write with STATUS:CANCELLED.
+
+        Cancellations are kept as tombstones so they are not re-sent and a re-added event gets a higher SEQUENCE.
+        """
+        cancelled = []
+        for key, old in previous.entries.items():
+            if key in self.entries:
+                continue
+            if old.get('cancelled'):
+                self.entries[key] = old
+                continue
+            self.entries[key] = dict(old, hash=None, sequence=old['sequence'] + 1, cancelled=True)
+            cancelled.append({
+                'uid': old['uid'],
+                'recurrence_id': parse_utc(old['recurrence_id']) if old['recurrence_id'] else None,
+                'begin': parse_utc(old['begin']),
+                'end': parse_utc(old['end']),
+                'summary': old['summary'],
+                'location': old['location'],
+                'description': old['description'],
+                'rrule': old['rrule'],
+                'exdates': [parse_utc(value) for value in old['exdates']],
+                'sequence': old['sequence'] + 1,
+                'status': 'CANCELLED',
+            })
+        return cancelled
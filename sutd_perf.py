@@ -0,0 +1,129 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Lightweight timing spans, a JSON-lines performance log and an optional cProfile hook.
+
+Wrap a phase in ``with perf.span("phase", week=3):``. Every finished span is
+appended to the performance log as one JSON object (run id, name, parent span,
+start time, duration, extra fields) and aggregated for the end-of-run summary.
+"""
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+PROFILE_TOP = 20  # Functions listed when a cProfile dump is summarised
+
+
+class PerfRecorder:
+    """Collects named spans for one run and optionally streams them to a JSON-lines file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.run_id = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.totals: Dict[str, List[float]] = {}  # name -> [count, total seconds, max seconds]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiler: Optional[cProfile.Profile] = None
+
+    @contextmanager
+    def span(self, name: str, **fields):
+        """Times the enclosed block. Spans opened inside it on the same thread record it as their parent."""
+        stack = self._local.__dict__.setdefault('stack', [])
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            self.record(name, seconds, parent=parent, started=started, **fields)
+
+    def record(self, name: str, seconds: float, parent: Optional[str] = None, started: Optional[float] = None, **fields):
+        """Adds an already-measured duration (used by span, or for timings taken elsewhere)."""
+        if parent is None:
+            stack = getattr(self._local, 'stack', None)
+            parent = stack[-1] if stack else None
+        with self._lock:
+            totals = self.totals.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+            if not self.path:
+                return
+            entry = {'run': self.run_id, 'name': name, 'parent': parent,
+                     'start': round(started if started is not None else time.time() - seconds, 6),
+                     'seconds': round(seconds, 6)}
+            if fields:
+                entry['fields'] = fields
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, default=str) + "\n")
+            except OSError as e:
+                logging.warning(f"Could not write performance record: {e}")
+                self.path = None
+
+    def summary_lines(self) -> List[str]:
+        """The end-of-run table: one row per span name, slowest total first."""
+        if not self.totals:
+            return []
+        lines = [f"{'phase':<24} {'count':>5} {'total s':>9} {'mean ms':>9} {'max ms':>9}"]
+        for name, (count, total, longest) in sorted(self.totals.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"{name:<24} {count:>5} {total:>9.2f} {total / count * 1000:>9.1f} {longest * 1000:>9.1f}")
+        return lines
+
+    def start_profiling(self):
+        """Turns cProfile on for the calling thread. Calls accumulate until dump_profile."""
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop_profiling(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+
+    @contextmanager
+    def profiling(self, enabled: bool = True):
+        if not enabled:
+            yield
+            return
+        self.start_profiling()
+        try:
+            yield
+        finally:
+            self.stop_profiling()
+
+    def dump_profile(self, path: str) -> List[str]:
+        """Writes the collected profile (open it with pstats or snakeviz) and returns the top functions by cumulative time."""
+        if self._profiler is None:
+            return []
+        self._profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        self._profiler = None
+        return [line for line in out.getvalue().splitlines() if line.strip()]
+
+
+def timed(name: str):
+    """Method decorator: runs the whole method inside self.perf.span(name)."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.perf.span(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,169 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""End-to-end scrape benchmark: the real bot in headless Chrome against the local stub portal.
+
+Each run starts the stub (with the configured latency and timetable), signs in
+with a stub session cookie, then times ``login_and_prepare_grid`` and
+``scrape_calendar_grid`` exactly as the app runs them. Reported per mode:
+seconds per week, WebDriver commands per week, and whether every expected session
+came back, so it doubles as a regression test for the scraper.
+
+``run_session_checks`` drives "Remember login" through the stub's own login
+page instead: a saved cookie that is still valid must reach the grid without a
+login, and an expired one must fall back to the login page and load the grid
+for the new session rather than the old one.
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from sutd_stub_portal import SESSION_COOKIE, StubConfig, start_stub_server
+
+# Mode name -> SUTDCalendarBot settings
+SCRAPE_MODES = {
+    "http": {'extraction_mode': "html", 'http_weeks': True},     # The default: week 1 in the browser, the rest over HTTP
+    "html": {'extraction_mode': "html", 'http_weeks': False},    # Next Week clicks, page_source parsed offline
+    "bulk": {'extraction_mode': "bulk", 'http_weeks': False},    # Next Week clicks, one execute_script per week
+    "legacy": {'extraction_mode': "legacy", 'http_weeks': False},  # Next Week clicks, per-element WebDriver calls
+}
+
+
+def _scrape_once(mode: str, config: StubConfig, portal, base_url: str, headless: bool) -> Dict:
+    # Imported here so the stub and the table code stay usable without Selenium
+    from sutd_calendar_bot import SUTDCalendarBot
+
+    bot = SUTDCalendarBot(log_callback=lambda message: None, portal_url=f"{base_url}/portal", perf_log=None,
+                          **SCRAPE_MODES[mode])
+    bot.headless = headless
+    bot.checkpoint_path = None  # Every run starts from scratch
+    bot.recess_weeks = {config.term_start + timedelta(weeks=w) for w in config.recess_weeks}
+    bot.start_browser()
+    try:
+        # The stub's login page stands in for SSO: hand the browser a session instead of typing into it
+        bot.driver.get(f"{base_url}/login")
+        bot.driver.add_cookie({'name': SESSION_COOKIE, 'value': portal.login(), 'path': '/'})
+
+        start = time.perf_counter()
+        bot.login_and_prepare_grid()
+        login_seconds = time.perf_counter() - start
+
+        commands_before = bot.command_count
+        start = time.perf_counter()
+        _, events = bot.scrape_calendar_grid()
+        scrape_seconds = time.perf_counter() - start
+        commands = bot.command_count - commands_before
+    finally:
+        bot.close()
+
+    weeks = max(bot.weeks_loaded, 1)
+    return {
+        'mode': mode,
+        'weeks': bot.weeks_loaded,
+        'sessions': len(events),
+        'expected': config.expected_sessions,
+        'login_s': login_seconds,
+        'scrape_s': scrape_seconds,
+        's_per_week': scrape_seconds / weeks,
+        'commands': commands,
+        'commands_per_week': commands / weeks,
+    }
+
+
+def _check_saved_session(portal, base_url: str, headless: bool, expired: bool) -> Dict:
+    """Logs in with remember_login and a saved stub cookie (expired or not) and reports what the bot did."""
+    from selenium.webdriver.common.by import By
+
+    from sutd_calendar_bot import SUTDCalendarBot
+
+    messages = []
+    bot = None
+
+    def log(message):
+        messages.append(message)
+        # The bot is now waiting for a manual login: sign in on the stub's login page like a user would
+        if message.startswith("ACTION REQUIRED"):
+            bot.driver.find_element(By.ID, "login-submit").click()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bot = SUTDCalendarBot(log_callback=log, portal_url=f"{base_url}/portal", remember_login=True,
+                              profile_dir=os.path.join(workdir, "profile"), perf_log=None)
+        bot.headless = headless
+        bot.checkpoint_path = None
+        bot.cookie_file = os.path.join(workdir, "cookies.json")
+        saved_token = portal.login()
+        if expired:
+            portal.expire_all()
+        with open(bot.cookie_file, 'w') as f:
+            json.dump({'url': f"{base_url}/portal",
+                       'cookies': [{'name': SESSION_COOKIE, 'value': saved_token, 'path': '/'}]}, f)
+        sessions_before = set(portal.sessions)
+
+        bot.start_browser()
+        try:
+            bot.login_and_prepare_grid()
+            shown_week = bot._page_state()['week']
+            browser_token = (bot.driver.get_cookie(SESSION_COOKIE) or {}).get('value')
+        finally:
+            bot.close()
+
+    return {
+        'skipped_sso': "Saved login is still valid. Skipping SSO!" in messages,
+        'logged_in': bool(set(portal.sessions) - sessions_before),
+        'grid_week': shown_week,
+        'fresh_session': browser_token is not None and browser_token != saved_token,
+        'stale_grid_used': portal.components[saved_token].state_num > 0,
+    }
+
+
+def run_session_checks(config: Optional[StubConfig] = None, headless: bool = True) -> bool:
+    """Checks the remembered-login reuse and expired-session fallback against the stub. Returns True if both behave."""
+    config = config or StubConfig()
+    server, portal, base_url = start_stub_server(config)
+    try:
+        valid = _check_saved_session(portal, base_url, headless, expired=False)
+        expired = _check_saved_session(portal, base_url, headless, expired=True)
+    finally:
+        server.shutdown()
+
+    checks = [
+        ("valid saved login skips SSO", valid['skipped_sso'] and not valid['logged_in'] and valid['grid_week'] is not None),
+        ("expired saved login falls back to the login page", not expired['skipped_sso'] and expired['logged_in']),
+        ("expired saved login loads the grid for the new session", expired['grid_week'] is not None
+         and expired['fresh_session'] and not expired['stale_grid_used']),
+    ]
+    for name, ok in checks:
+        print(f"{'ok' if ok else 'FAILED':<7} {name}")
+    return all(ok for _, ok in checks)
+
+
+def run_scrape_benchmark(modes: Optional[List[str]] = None, config: Optional[StubConfig] = None,
+                         repeat: int = 1, headless: bool = True) -> List[Dict]:
+    """Scrapes the stub term with every mode, prints a summary table and returns one row per mode (best run)."""
+    config = config or StubConfig()
+    modes = modes or list(SCRAPE_MODES)
+    server, portal, base_url = start_stub_server(config)
+    print(f"Stub portal at {base_url}: {config.weeks} weeks, {len(config.timetable)} classes a week, "
+          f"{config.latency * 1000:.0f} ms latency per request.")
+
+    rows = []
+    try:
+        for mode in modes:
+            runs = [_scrape_once(mode, config, portal, base_url, headless) for _ in range(repeat)]
+            rows.append(min(runs, key=lambda run: run['scrape_s']))
+    finally:
+        server.shutdown()
+
+    print(f"{'mode':<7} {'weeks':>5} {'sessions':>9} {'login s':>8} {'scrape s':>9} {'s/week':>7} {'cmds':>6} {'cmds/week':>9}")
+    for row in rows:
+        check = "" if row['sessions'] == row['expected'] else f"  MISMATCH (expected {row['expected']})"
+        print(f"{row['mode']:<7} {row['weeks']:>5} {row['sessions']:>9} {row['login_s']:>8.2f} {row['scrape_s']:>9.2f} "
+              f"{row['s_per_week']:>7.3f} {row['commands']:>6} {row['commands_per_week']:>9.1f}{check}")
+    return rows
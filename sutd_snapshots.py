@@ -0,0 +1,168 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Record-and-replay snapshots of the Weekly Schedule, plus an offline parsing benchmark.
+
+A snapshot is a zip archive holding one HTML file per scraped week and a
+``manifest.json`` listing each week's start date. ``--record`` writes one while
+scraping; ``--replay`` and ``--benchmark`` run the post-login pipeline from it
+without a browser.
+"""
+
+import glob
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from sutd_events import ClassEvent, dedupe_events
+from sutd_grid_parser import build_courses_summary, cell_cache_stats, parse_week_html, reset_cell_cache
+from sutd_term import week_monday
+
+SNAPSHOT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+class SnapshotRecorder:
+    """Streams each week's raw grid HTML into a compressed snapshot archive."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.weeks: List[Dict] = []
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def add_week(self, week_start: date, html: str):
+        name = f"weeks/{len(self.weeks):02d}_{week_start.isoformat()}.html"
+        self._zip.writestr(name, html)
+        self.weeks.append({'week_start': week_start.isoformat(), 'file': name})
+
+    def close(self):
+        if self._zip is None:
+            return
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'weeks': self.weeks,
+        }
+        self._zip.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+        self._zip.close()
+        self._zip = None
+
+
+def load_snapshot(path: str) -> List[Tuple[date, str]]:
+    """Returns [(week_start, html), ...] in the order the weeks were recorded."""
+    with zipfile.ZipFile(path) as zf:
+        manifest = json.loads(zf.read(MANIFEST_NAME))
+        if manifest.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {manifest.get('version')} in {path}")
+        return [
+            (date.fromisoformat(week['week_start']), zf.read(week['file']).decode('utf-8'))
+            for week in manifest['weeks']
+        ]
+
+
+def parse_snapshot_weeks(weeks: List[Tuple[date, str]]) -> Tuple[List[Dict], List[ClassEvent]]:
+    """Runs the week parser over recorded pages and returns (courses_list, all_events)."""
+    all_events = []
+    for week_start, html in weeks:
+        _, week_events = parse_week_html(html, week_start=week_start)
+        all_events.extend(week_events)
+    return build_courses_summary(all_events), all_events
+
+
+def replay_snapshot(path: str, bot, reminder_minutes: int = 15, output_dir: Optional[str] = None, recurring: bool = False):
+    """Runs parse -> dedup -> export from a snapshot. Conflicts are kept as-is since there is nobody to ask."""
+    bot.log(f"Replaying snapshot {path}...")
+    with bot.perf.span("load"):
+        weeks = load_snapshot(path)
+    with bot.perf.span("parse", weeks=len(weeks)):
+        courses, all_events = parse_snapshot_weeks(weeks)
+    with bot.perf.span("dedup"):
+        events = dedupe_events(all_events)
+    if getattr(bot, 'store_path', None):
+        by_week = {week_monday(week_start): [] for week_start, _ in weeks}
+        for ev in events:
+            by_week.setdefault(week_monday(ev.date), []).append(ev)
+        bot.save_to_store(by_week)
+    stats = cell_cache_stats()
+    bot.log(f"Replayed {len(weeks)} weeks: {len(courses)} courses, {len(events)} sessions "
+            f"(cell cache {stats['hit_rate']:.0%} hit rate).")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    bot.generate_outputs(events, reminder_minutes=reminder_minutes, output_dir=output_dir, recurring=recurring)
+    return courses, events
+
+
+def find_snapshots(paths: List[str]) -> List[str]:
+    """Expands directories into the snapshot archives they contain."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, "*.zip"))))
+        else:
+            found.append(path)
+    return found
+
+
+def _measure(fn, *args, **kwargs):
+    """Runs fn once and returns (result, seconds, peak_bytes_allocated)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run_benchmark(paths: List[str], bot, repeat: int = 3) -> List[Dict]:
+    """Times load, parse, dedup and export for every snapshot in the corpus and prints a summary table."""
+    snapshots = find_snapshots(paths)
+    if not snapshots:
+        raise FileNotFoundError("No snapshot archives found to benchmark.")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for snapshot in snapshots:
+            stages = {'load': [], 'parse': [], 'dedup': [], 'export': []}
+            peaks = {name: 0 for name in stages}
+            for _ in range(repeat):
+                reset_cell_cache()
+                weeks, t, peak = _measure(load_snapshot, snapshot)
+                stages['load'].append(t); peaks['load'] = max(peaks['load'], peak)
+                (_, events), t, peak = _measure(parse_snapshot_weeks, weeks)
+                stages['parse'].append(t); peaks['parse'] = max(peaks['parse'], peak)
+                hit_rate = cell_cache_stats()['hit_rate']
+                events, t, peak = _measure(dedupe_events, events)
+                stages['dedup'].append(t); peaks['dedup'] = max(peaks['dedup'], peak)
+                # A fresh directory each time, so no export diffs against a manifest left by the previous one
+                export_dir = tempfile.mkdtemp(dir=out_dir)
+                _, t, peak = _measure(bot.generate_outputs, events, output_dir=export_dir)
+                stages['export'].append(t); peaks['export'] = max(peaks['export'], peak)
+
+            for name, timings in stages.items():
+                rows.append({
+                    'snapshot': os.path.basename(snapshot),
+                    'weeks': len(weeks),
+                    'events': len(events),
+                    'stage': name,
+                    'best_ms': min(timings) * 1000,
+                    'mean_ms': sum(timings) / len(timings) * 1000,
+                    'peak_kib': peaks[name] / 1024,
+                    'cache_hit_rate': hit_rate,
+                })
+
+    print(f"{'snapshot':<28} {'weeks':>5} {'events':>6} {'stage':<7} {'best ms':>9} {'mean ms':>9} {'peak KiB':>9} {'cache':>6}")
+    for row in rows:
+        print(f"{row['snapshot']:<28} {row['weeks']:>5} {row['events']:>6} {row['stage']:<7} "
+              f"{row['best_ms']:>9.2f} {row['mean_ms']:>9.2f} {row['peak_kib']:>9.1f} {row['cache_hit_rate']:>6.0%}")
+    return rows
@@ -0,0 +1,74 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Cold-start benchmark for the bot's entry points.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` and the
+cumulative time Python reports for it is taken, so the numbers reflect a cold
+start (the same work a PyInstaller build or a cron job pays) rather than a
+warmed-up process. The headless entry point is checked against a budget.
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_STARTUP_BUDGET_MS = 150.0
+STARTUP_MODULES = [("headless", "sutd_calendar_bot"), ("gui", "sutd_gui")]
+TOP_IMPORTS = 5  # Slowest imports listed per entry point
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parses '-X importtime' output into [(module, self_us, cumulative_us), ...]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        rows.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return rows
+
+
+def measure_import(module: str) -> Dict:
+    """Imports module in a fresh interpreter and returns its cumulative import time and the slowest imports."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    rows = parse_importtime(proc.stderr)
+    total_us = next((cumulative for name, _, cumulative in rows if name == module), 0)
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:TOP_IMPORTS]
+    return {'total_ms': total_us / 1000, 'slowest': [(name, self_us / 1000) for name, self_us, _ in slowest]}
+
+
+def run_startup_benchmark(repeat: int = 3, budget_ms: float = DEFAULT_STARTUP_BUDGET_MS) -> bool:
+    """Prints best-of-repeat import times per entry point. Returns False if the headless one is over budget.
+
+    The GUI entry point is skipped, not failed, when it cannot be imported: a headless machine has no customtkinter.
+    """
+    within_budget = True
+    for label, module in STARTUP_MODULES:
+        try:
+            runs = [measure_import(module) for _ in range(repeat)]
+        except RuntimeError as e:
+            if label == "headless":
+                raise
+            print(f"{label:<9} import {module:<18} skipped ({str(e).splitlines()[-1]})")
+            continue
+        best = min(runs, key=lambda run: run['total_ms'])
+        line = f"{label:<9} import {module:<18} best {best['total_ms']:8.1f} ms  mean {sum(r['total_ms'] for r in runs) / len(runs):8.1f} ms"
+        if label == "headless":
+            over = best['total_ms'] > budget_ms
+            within_budget = within_budget and not over
+            line += f"  budget {budget_ms:g} ms {'EXCEEDED' if over else 'ok'}"
+        print(line)
+        for name, self_ms in best['slowest']:
+            print(f"          {self_ms:8.1f} ms  {name}")
+    return within_budget
@@ -0,0 +1,217 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Optional SQLite store of scraped class sessions, kept across terms.
+
+Each scan (or ``--replay``) replaces the weeks it loaded, so a re-sync updates
+moved classes and drops cancelled ones without touching other weeks. Sessions
+are indexed by date, course code, type and location; queries and the CSV/ICS
+exports walk a cursor, so nothing is loaded into memory as a whole.
+"""
+
+import csv
+import os
+import sqlite3
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sutd_events import CSV_FIELDS, TIMEZONE, ClassEvent, ics_entry
+
+SCHEMA_VERSION = 1
+FETCH_SIZE = 500  # Rows pulled from the cursor at a time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    term        TEXT NOT NULL,
+    code        TEXT NOT NULL,
+    section     TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    type        TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    start       INTEGER NOT NULL,
+    end         INTEGER NOT NULL,
+    location    TEXT NOT NULL,
+    instructors TEXT NOT NULL,
+    PRIMARY KEY (code, section, type, date, start)
+);
+CREATE INDEX IF NOT EXISTS sessions_date ON sessions (date, start);
+CREATE INDEX IF NOT EXISTS sessions_code ON sessions (code, date);
+CREATE INDEX IF NOT EXISTS sessions_type ON sessions (type, date);
+CREATE INDEX IF NOT EXISTS sessions_location ON sessions (location, date);
+CREATE INDEX IF NOT EXISTS sessions_term ON sessions (term, code);
+"""
+
+COLUMNS = "code, section, title, type, date, start, end, location, instructors"
+TERM_STARTS = ("Jan", "May", "Sep")  # SUTD's terms fall in these thirds of the year, but their numbering depends on the cohort
+
+
+def term_of(day: date) -> str:
+    """Term label for a date: the year and the month its third of the year starts (2025-Jan, 2025-May, 2025-Sep)."""
+    return f"{day.year}-{TERM_STARTS[(day.month - 1) // 4]}"
+
+
+def week_range(which: str, today: Optional[date] = None) -> Tuple[date, date]:
+    """Monday and Sunday of 'this' or 'next' week."""
+    today = today or date.today()
+    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=1 if which == "next" else 0)
+    return monday, monday + timedelta(days=6)
+
+
+def _event(row) -> ClassEvent:
+    code, section, title, type_, day, start, end, location, instructors = row
+    return ClassEvent(code, section, title, type_, date.fromisoformat(day), start, end, location, instructors)
+
+
+class EventStore:
+    """A sessions database. Use as a context manager so it is closed (and committed) afterwards."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self.conn.close()
+            raise ValueError(f"{path} was written by a newer version of the bot (schema {version})")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def save_weeks(self, weeks: Dict[date, List[ClassEvent]]) -> int:
+        """Replaces every given week (Monday -> its sessions) in one transaction. Returns the sessions written."""
+        count = 0
+        with self.conn:
+            for monday, events in weeks.items():
+                self.conn.execute("DELETE FROM sessions WHERE date BETWEEN ? AND ?",
+                                  (monday.isoformat(), (monday + timedelta(days=6)).isoformat()))
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO sessions (term, {COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((term_of(ev.date), ev.code, ev.section, ev.title, ev.type, ev.date.isoformat(),
+                      ev.start, ev.end, ev.location, ev.instructors) for ev in events))
+                count += len(events)
+        return count
+
+    @staticmethod
+    def _where(date_from: Optional[date] = None, date_to: Optional[date] = None, code: Optional[str] = None,
+               type: Optional[str] = None, location: Optional[str] = None, term: Optional[str] = None) -> Tuple[str, list]:
+        """Builds the WHERE clause. Every filter is an equality or range test so it can use an index."""
+        clauses, params = [], []
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from.isoformat())
+        if date_to:
+            clauses.append("date <= ?")
+            params.append(date_to.isoformat())
+        if code:
+            clauses.append("code = ?")
+            params.append(code)
+        if type:
+            clauses.append("type = ?")
+            params.append(type.upper())
+        if location:
+            # Prefix match as a range, so "1.502" finds "1.502 Think Tank" and still uses the location index
+            clauses.append("location >= ? AND location < ?")
+            params.extend([location, location + "\U0010ffff"])
+        if term:
+            clauses.append("term = ?")
+            params.append(term)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def iter_events(self, **filters) -> Iterator[ClassEvent]:
+        """Matching sessions in date/time order, read from the cursor in chunks."""
+        where, params = self._where(**filters)
+        cursor = self.conn.execute(f"SELECT {COLUMNS} FROM sessions{where} ORDER BY date, start, code", params)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                yield _event(row)
+
+    def hours_per_course(self, **filters) -> List[Tuple[str, str, int, float]]:
+        """(code, title, sessions, hours) per course, most hours first."""
+        where, params = self._where(**filters)
+        return self.conn.execute(
+            f"SELECT code, MAX(title), COUNT(*), SUM(end - start) / 60.0 FROM sessions{where} "
+            "GROUP BY code ORDER BY 4 DESC, code", params).fetchall()
+
+    def terms(self) -> List[Tuple[str, int]]:
+        return self.conn.execute("SELECT term, COUNT(*) FROM sessions GROUP BY term ORDER BY term").fetchall()
+
+    def export_csv(self, path: str, **filters) -> int:
+        """Streams matching sessions to a CSV in the same layout as the normal export."""
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for ev in self.iter_events(**filters):
+                writer.writerow(ev.as_csv_row())
+                count += 1
+        return count
+
+    def export_ics(self, path: str, reminder_minutes: int = 15, **filters) -> int:
+        """Streams matching sessions to an ICS, one event per session with the same UIDs as the normal export."""
+        # Imported here so queries that only print never load the ICS writer
+        from sutd_ics import ICSWriter, get_timezone, stable_uid
+
+        tz = get_timezone(TIMEZONE)
+        with open(path, 'w', encoding='utf-8', newline='') as f, ICSWriter(f) as writer:
+            for ev in self.iter_events(**filters):
+                uid = stable_uid(ev.code, ev.section, ev.type, ev.date.isoformat(), ev.start)
+                writer.write_event(reminder_minutes=reminder_minutes, **ics_entry(ev, tz, uid=uid))
+        return writer.count
+
+
+def run_query(path: str, filters: Dict, hours: bool = False, export_csv: Optional[str] = None,
+              export_ics: Optional[str] = None, reminder_minutes: int = 15) -> int:
+    """The --query command: prints matching sessions (or hours per course), or streams them to CSV/ICS."""
+    # Opening a missing path would quietly create an empty database
+    if not os.path.exists(path):
+        print(f"No session database at {path}. Scan or --replay with --store first.")
+        return 1
+    with EventStore(path) as store:
+        if export_csv or export_ics:
+            if export_csv:
+                print(f"Wrote {store.export_csv(export_csv, **filters)} sessions to {export_csv}")
+            if export_ics:
+                print(f"Wrote {store.export_ics(export_ics, reminder_minutes, **filters)} sessions to {export_ics}")
+            return 0
+
+        if hours:
+            rows = store.hours_per_course(**filters)
+            if not rows:
+                print(_no_match(store, path))
+                return 0
+            print(f"{'course':<8} {'sessions':>8} {'hours':>7}  title")
+            for code, title, sessions, total in rows:
+                print(f"{code:<8} {sessions:>8} {total:>7.1f}  {title}")
+            print(f"{'total':<8} {sum(r[2] for r in rows):>8} {sum(r[3] for r in rows):>7.1f}")
+            return 0
+
+        count = 0
+        for ev in store.iter_events(**filters):
+            print(f"{ev.date:%a %d %b %Y} {ev.start_time}-{ev.end_time}  {ev.code:<7} {ev.type:<4} {ev.section:<4} "
+                  f"{ev.location:<12} {ev.title}")
+            count += 1
+        if not count:
+            print(_no_match(store, path))
+        return 0
+
+
+def _no_match(store: EventStore, path: str) -> str:
+    terms = ", ".join(f"{term} ({n} sessions)" for term, n in store.terms()) or "none"
+    return f"No sessions match. Terms in {path}: {terms}"
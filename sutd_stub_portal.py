@@ -0,0 +1,388 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Local stand-in for the SUTD portal, for exercising the bot without SSO.
+
+Serves a fake login page, the portal landing link, the Weekly Schedule iframe and
+a PeopleSoft-style component page (checkboxes, Refresh, Next Week) with the same
+element IDs the bot looks for. Component requests can be slowed down to mimic
+PeopleSoft's round-trips, and the timetable can be a generated one of any size.
+Run it and point the bot at it:
+
+    python sutd_stub_portal.py --port 8765 --latency 0.3 --courses 8
+    python sutd_calendar_bot.py --portal-url http://127.0.0.1:8765/portal
+"""
+
+import argparse
+import html
+import random
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+SESSION_COOKIE = "STUB_PS_TOKEN"
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SLOT_MINUTES = 30
+GRID_START, GRID_END = 8 * 60, 20 * 60
+
+
+class StubClass(NamedTuple):
+    code: str
+    section: str
+    title: str
+    type: str
+    weekday: int  # 0 = Monday
+    start: int    # minutes after midnight
+    end: int
+    location: str
+    instructors: str
+
+
+# A small but realistic timetable, including one clash (Friday 10:00) that the grid renders as 'Time Conflict'
+DEFAULT_TIMETABLE = [
+    StubClass("50.002", "CI01", "Computation Structures", "LEC", 0, 9 * 60, 10 * 60 + 30, "LT2", "Ernest Chong, Natalie Agus"),
+    StubClass("50.002", "CI01", "Computation Structures", "LAB", 2, 13 * 60, 15 * 60, "2.505", "Natalie Agus"),
+    StubClass("10.013", "LB03", "Modelling and Analysis", "CBL", 1, 10 * 60, 12 * 60, "1.502", "Staff"),
+    StubClass("10.013", "LB03", "Modelling and Analysis", "CBL", 3, 10 * 60, 12 * 60, "1.502", "Staff"),
+    StubClass("02.001", "S1", "Global Humanities", "CBL", 4, 10 * 60, 11 * 60 + 30, "2.506", "Jane Doe"),
+    StubClass("03.007", "S2", "Design Thinking", "LEC", 4, 11 * 60, 12 * 60, "LT5", "John Smith"),
+]
+
+
+def synthetic_timetable(courses: int = 6, seed: int = 0) -> List[StubClass]:
+    """A random but reproducible weekly timetable: 2-3 sessions per course on the half hour, clashes allowed."""
+    rng = random.Random(seed)
+    types = ["LEC", "CBL", "LAB", "TUT"]
+    timetable = []
+    for i in range(courses):
+        code = f"{rng.randint(1, 99):02d}.{rng.randint(1, 999):03d}"
+        section = f"CI{i + 1:02d}"
+        for _ in range(rng.randint(2, 3)):
+            start = rng.randrange(GRID_START + 30, GRID_END - 3 * 60, SLOT_MINUTES)
+            timetable.append(StubClass(code, section, f"Synthetic Course {i + 1}", rng.choice(types), rng.randrange(5),
+                                       start, start + rng.choice((60, 90, 120)), f"{rng.randint(1, 3)}.{rng.randint(101, 615)}",
+                                       f"Instructor {rng.randint(1, 40)}"))
+    return timetable
+
+
+@dataclass
+class StubConfig:
+    term_start: date = date(2025, 1, 13)   # a Monday
+    weeks: int = 14
+    recess_weeks: Tuple[int, ...] = (6,)   # 0-based week indexes with no classes
+    timetable: List[StubClass] = field(default_factory=lambda: list(DEFAULT_TIMETABLE))
+    session_ttl: int = 3600                # seconds a login stays valid
+    latency: float = 0.0                   # seconds added to every component request (a PeopleSoft round-trip)
+    latency_jitter: float = 0.0            # plus up to this much at random
+
+    @property
+    def expected_sessions(self) -> int:
+        """Sessions a complete scrape of the term should return (each clash member counts once)."""
+        return (self.weeks - len([w for w in self.recess_weeks if w < self.weeks])) * len(self.timetable)
+
+
+def format_time(minutes: int) -> str:
+    hours, mins = divmod(minutes, 60)
+    return f"{(hours - 1) % 12 + 1}:{mins:02d}{'PM' if hours >= 12 else 'AM'}"
+
+
+def _cell_html(cls: StubClass, show_title: bool, show_instr: bool) -> str:
+    lines = [f"{cls.code} - {cls.section}"]
+    if show_title:
+        lines.append(cls.title)
+    lines += [cls.type, f"{format_time(cls.start)} - {format_time(cls.end)}", cls.location]
+    if show_instr:
+        lines.append(f"Instructors: {cls.instructors}")
+    return "<br>".join(html.escape(line) for line in lines)
+
+
+def render_week_grid(classes: List[StubClass], show_title: bool = True, show_instr: bool = True) -> str:
+    """Renders a PeopleSoft-style weekly grid table: 30-minute rows, one rowspan'd cell per class (or clash)."""
+    # Overlapping classes on the same day share one orange 'Time Conflict' cell, like PeopleSoft does
+    blocks = {}  # (weekday, first_row) -> (rows, html, is_conflict)
+    for weekday in range(7):
+        day_classes = sorted((c for c in classes if c.weekday == weekday), key=lambda c: c.start)
+        groups = []
+        for cls in day_classes:
+            if groups and cls.start < groups[-1][1]:
+                groups[-1][1] = max(groups[-1][1], cls.end)
+                groups[-1][2].append(cls)
+            else:
+                groups.append([cls.start, cls.end, [cls]])
+        for start, end, members in groups:
+            first_row = (start - GRID_START) // SLOT_MINUTES
+            rows = max(1, -(-(end - start) // SLOT_MINUTES))
+            if len(members) > 1:
+                body = "<br>".join("Time Conflict<br>" + _cell_html(c, show_title, show_instr) for c in members)
+            else:
+                body = _cell_html(members[0], show_title, show_instr)
+            blocks[(weekday, first_row)] = (rows, body, len(members) > 1)
+
+    out = ['<table id="WEEKLY_SCHED_HTMLAREA" class="PSLEVEL1GRID" cellspacing="0">',
+           '<tr><th class="SSSWEEKLYTIMEBACKGROUND">Time</th>'
+           + "".join(f'<th class="SSSWEEKLYDAYBACKGROUND">{day}</th>' for day in DAY_NAMES) + '</tr>']
+    covered = set()
+    for row in range((GRID_END - GRID_START) // SLOT_MINUTES):
+        cells = [f'<td class="SSSWEEKLYTIMEBACKGROUND">{format_time(GRID_START + row * SLOT_MINUTES)}</td>']
+        for weekday in range(7):
+            if (weekday, row) in covered:
+                continue
+            block = blocks.get((weekday, row))
+            if block:
+                rows, body, conflict = block
+                style = ' style="background-color:#FFA500"' if conflict else ''
+                cells.append(f'<td class="SSSWEEKLYBACKGROUND" rowspan="{rows}"{style}>'
+                             f'<span class="SSSTEXTWEEKLY">{body}</span></td>')
+                covered.update((weekday, row + r) for r in range(1, rows))
+            else:
+                cells.append('<td class="PSLEVEL3GRIDODDROW">&nbsp;</td>')
+        out.append("<tr>" + "".join(cells) + "</tr>")
+    out.append("</table>")
+    return "\n".join(out)
+
+
+@dataclass
+class ComponentState:
+    """Per-session PeopleSoft component state (what a real server keeps behind ICStateNum)."""
+    week_idx: int = 0
+    show_title: bool = False
+    show_instr: bool = False
+    state_num: int = 1
+
+
+class StubPortal:
+    """Holds sessions and component state; the HTTP handler delegates to it."""
+
+    def __init__(self, config: Optional[StubConfig] = None):
+        self.config = config or StubConfig()
+        self.sessions: Dict[str, float] = {}  # token -> expiry time
+        self.users: Dict[str, str] = {}  # token -> username it was signed in with
+        self.components: Dict[str, ComponentState] = {}
+        self.lock = threading.Lock()
+
+    def login(self, username: str = "student") -> str:
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[token] = time.time() + self.config.session_ttl
+            self.users[token] = username
+            self.components[token] = ComponentState()
+        return token
+
+    def is_valid(self, token: Optional[str]) -> bool:
+        with self.lock:
+            return bool(token) and self.sessions.get(token, 0) > time.time()
+
+    def delay(self):
+        """Sleeps for the configured component latency."""
+        seconds = self.config.latency + random.uniform(0, self.config.latency_jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def expire_all(self):
+        with self.lock:
+            self.sessions.clear()
+
+    def week_start(self, week_idx: int) -> date:
+        return self.config.term_start + timedelta(weeks=week_idx)
+
+    def week_classes(self, week_idx: int) -> List[StubClass]:
+        return [] if week_idx in self.config.recess_weeks else self.config.timetable
+
+    def apply_action(self, token: str, action: str, form: Dict[str, str]) -> ComponentState:
+        """Applies an ICAction the way the Weekly Schedule component would."""
+        with self.lock:
+            state = self.components.setdefault(token, ComponentState())
+            if action and form.get("ICStateNum") != str(state.state_num):
+                # Out of sequence (a stale page or a replayed POST): PeopleSoft ignores it and re-sends the current state
+                return ComponentState(**vars(state))
+            if action == "DERIVED_CLASS_S_SSR_DISP_TITLE":
+                state.show_title = form.get("DERIVED_CLASS_S_SSR_DISP_TITLE") == "Y"
+            elif action == "DERIVED_CLASS_S_SHOW_INSTR":
+                state.show_instr = form.get("DERIVED_CLASS_S_SHOW_INSTR") == "Y"
+            elif action == "DERIVED_CLASS_S_SSR_NEXT_WEEK":
+                state.week_idx = min(state.week_idx + 1, self.config.weeks - 1)
+            elif action == "DERIVED_CLASS_S_SSR_PREV_WEEK":
+                state.week_idx = max(state.week_idx - 1, 0)
+            elif action == "DERIVED_CLASS_S_SSR_REFRESH_CAL$38$" and form.get("DERIVED_CLASS_S_START_DT"):
+                # Jump to the week holding the typed date (past the term end, PeopleSoft keeps showing the last week)
+                try:
+                    day = datetime.strptime(form["DERIVED_CLASS_S_START_DT"], "%d/%m/%Y").date()
+                    offset = (day - self.config.term_start).days // 7
+                    state.week_idx = min(max(offset, 0), self.config.weeks - 1)
+                except ValueError:
+                    pass
+            if action:
+                state.state_num += 1
+            return ComponentState(**vars(state))
+
+    def render_component(self, state: ComponentState, username: str = "student") -> str:
+        start = self.week_start(state.week_idx)
+        end = start + timedelta(days=6)
+        last_week = state.week_idx >= self.config.weeks - 1
+        checked = lambda flag: ' checked="checked"' if flag else ''
+        return f"""<!DOCTYPE html>
+<html><head><title>My Weekly Schedule</title>
+<script>
+function submitAction_win0(form, action) {{
+    document.getElementById('WAIT_win0').style.display = 'block';
+    form.ICAction.value = action;
+    form.submit();
+}}
+</script></head>
+<body>
+<div id="WAIT_win0" style="display:none">Processing...</div>
+<form name="win0" id="win0" method="post" action="/psc/component">
+<input type="hidden" name="ICAction" id="ICAction" value="None">
+<input type="hidden" name="ICStateNum" id="ICStateNum" value="{state.state_num}">
+<input type="hidden" name="ICSID" id="ICSID" value="stub">
+<span id="DERIVED_SSTSNAV_PERSON_NAME" class="PSEDITBOX_DISPONLY">{html.escape(username)}</span>
+<label>Start Date <input type="text" name="DERIVED_CLASS_S_START_DT" id="DERIVED_CLASS_S_START_DT" value="{start.day}/{start.month}/{start.year}"></label>
+<span class="PSEDITBOX_DISPONLY">Week of {start.day}/{start.month}/{start.year} - {end.day}/{end.month}/{end.year}</span>
+<input type="hidden" name="DERIVED_CLASS_S_SSR_DISP_TITLE" value="{'Y' if not state.show_title else 'N'}">
+<label><input type="checkbox" id="DERIVED_CLASS_S_SSR_DISP_TITLE"{checked(state.show_title)}
+  onclick="submitAction_win0(this.form, 'DERIVED_CLASS_S_SSR_DISP_TITLE')"> Show Class Title</label>
+<input type="hidden" name="DERIVED_CLASS_S_SHOW_INSTR" value="{'Y' if not state.show_instr else 'N'}">
+<label><input type="checkbox" id="DERIVED_CLASS_S_SHOW_INSTR"{checked(state.show_instr)}
+  onclick="submitAction_win0(this.form, 'DERIVED_CLASS_S_SHOW_INSTR')"> Show Instructors</label>
+<input type="button" id="DERIVED_CLASS_S_SSR_REFRESH_CAL$38$" value="Refresh Calendar"
+  onclick="submitAction_win0(this.form, 'DERIVED_CLASS_S_SSR_REFRESH_CAL$38$')">
+<input type="button" id="DERIVED_CLASS_S_SSR_PREV_WEEK" value="&lt;&lt; Previous Week"
+  onclick="submitAction_win0(this.form, 'DERIVED_CLASS_S_SSR_PREV_WEEK')">
+<input type="button" id="DERIVED_CLASS_S_SSR_NEXT_WEEK" value="Next Week &gt;&gt;" title="Next Week &gt;&gt;"{' disabled="disabled"' if last_week else ''}
+  onclick="submitAction_win0(this.form, 'DERIVED_CLASS_S_SSR_NEXT_WEEK')">
+{render_week_grid(self.week_classes(state.week_idx), state.show_title, state.show_instr)}
+</form></body></html>"""
+
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>SUTD Login (stub)</title></head><body>
+<h1>Sign in (stub)</h1>
+<form method="post" action="/login">
+<input type="text" name="username" id="username" value="student">
+<input type="password" name="password" id="password" value="password">
+<button type="submit" id="login-submit">Sign in</button>
+</form></body></html>"""
+
+PORTAL_PAGE = """<!DOCTYPE html>
+<html><head><title>Student Portal (stub)</title></head><body>
+<a class="PSHYPERLINKNOUL" href="/home">Student Center</a>
+</body></html>"""
+
+HOME_PAGE = """<!DOCTYPE html>
+<html><head><title>Student Center (stub)</title></head><body>
+<a id="ADMN_S20160108140638335703604" href="/schedule">My Weekly Schedule</a>
+</body></html>"""
+
+SCHEDULE_PAGE = """<!DOCTYPE html>
+<html><head><title>Weekly Schedule (stub)</title></head><body>
+<iframe id="ptifrmtgtframe" name="TargetContent" src="/psc/component" width="100%" height="2000"></iframe>
+</body></html>"""
+
+
+def make_handler(portal: StubPortal):
+    class StubHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _token(self) -> Optional[str]:
+            cookie = SimpleCookie(self.headers.get("Cookie", ""))
+            return cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+
+        def _send(self, body: str, status: int = 200, headers: Optional[Dict[str, str]] = None):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _redirect(self, location: str, headers: Optional[Dict[str, str]] = None):
+            self._send("", 302, dict(headers or {}, Location=location))
+
+        def _form(self) -> Dict[str, str]:
+            length = int(self.headers.get("Content-Length", 0))
+            fields = parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+            return {name: values[-1] for name, values in fields.items()}
+
+        def do_GET(self):
+            path = urlsplit(self.path).path
+            token = self._token()
+            if path == "/login":
+                return self._send(LOGIN_PAGE)
+            if path == "/logout":
+                portal.expire_all()
+                return self._redirect("/login")
+            if path == "/favicon.ico":
+                return self._send("", 404)
+            if not portal.is_valid(token):
+                return self._redirect("/login")
+            if path == "/portal":
+                return self._send(PORTAL_PAGE)
+            if path == "/home":
+                return self._send(HOME_PAGE)
+            if path == "/schedule":
+                return self._send(SCHEDULE_PAGE)
+            if path == "/psc/component":
+                portal.delay()
+                return self._send(portal.render_component(portal.apply_action(token, "", {}), portal.users.get(token, "")))
+            self._send("Not found", 404)
+
+        def do_POST(self):
+            path = urlsplit(self.path).path
+            form = self._form()
+            if path == "/login":
+                token = portal.login(form.get("username") or "student")
+                cookie = f"{SESSION_COOKIE}={token}; Path=/; Max-Age={portal.config.session_ttl}"
+                return self._redirect("/portal", {"Set-Cookie": cookie})
+            token = self._token()
+            if not portal.is_valid(token):
+                return self._redirect("/login")
+            if path == "/psc/component":
+                portal.delay()
+                state = portal.apply_action(token, form.get("ICAction", ""), form)
+                return self._send(portal.render_component(state, portal.users.get(token, "")))
+            self._send("Not found", 404)
+
+    return StubHandler
+
+
+def start_stub_server(config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+    """Starts the stub portal on a background thread. Returns (server, portal, base_url); call server.shutdown() to stop."""
+    portal = StubPortal(config)
+    server = ThreadingHTTPServer((host, port), make_handler(portal))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, portal, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the SUTD portal.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--weeks", type=int, default=14)
+    parser.add_argument("--session-ttl", type=int, default=3600, help="Seconds a stub login stays valid.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every schedule request.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency of up to this many seconds.")
+    parser.add_argument("--courses", type=int, help="Serve a generated timetable with this many courses instead of the built-in one.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --courses.")
+    args = parser.parse_args()
+
+    config = StubConfig(weeks=args.weeks, session_ttl=args.session_ttl, latency=args.latency, latency_jitter=args.jitter)
+    if args.courses:
+        config.timetable = synthetic_timetable(args.courses, args.seed)
+    server, _, base_url = start_stub_server(config, port=args.port)
+    print(f"Stub portal running. Point the bot at {base_url}/portal (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
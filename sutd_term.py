@@ -0,0 +1,91 @@
+# Copyright (C) 2024 Itsskiip
+# Copyright (C) 2025 raghav0818
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License v3
+
+"""Works out which schedule weeks are worth loading.
+
+Recess weeks come from a small local academic-calendar file so they are never
+requested, and a user-supplied date range limits a re-sync to the weeks it
+covers. The file looks like::
+
+    {"recess": [{"name": "Recess Week", "start": "2025-02-24", "end": "2025-03-02"}]}
+"""
+
+import json
+import logging
+import os
+from datetime import date, timedelta
+from typing import List, Optional, Set
+
+DEFAULT_MAX_EMPTY_WEEKS = 2  # Consecutive class-free weeks that mean the term is over (0 = never stop early)
+
+
+def week_monday(day: date) -> date:
+    """The Monday of the schedule week containing day."""
+    return day - timedelta(days=day.weekday())
+
+
+def load_recess_weeks(path: str) -> Set[date]:
+    """Reads the academic-calendar file and returns the Mondays of every week it marks as recess."""
+    if not os.path.exists(path):
+        return set()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        weeks = set()
+        for period in data.get('recess', []):
+            start = date.fromisoformat(period['start'])
+            end = date.fromisoformat(period.get('end', period['start']))
+            monday = week_monday(start)
+            while monday <= end:
+                weeks.add(monday)
+                monday += timedelta(weeks=1)
+        return weeks
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logging.warning(f"Ignoring unreadable academic calendar {path}: {e}")
+        return set()
+
+
+def plan_weeks(first_week: date, end_date: Optional[date], recess_weeks: Set[date], max_weeks: int) -> List[date]:
+    """Week starts to load, from first_week through end_date (or max_weeks weeks), minus known recess weeks."""
+    last_week = end_date if end_date else first_week + timedelta(weeks=max_weeks - 1)
+    weeks = []
+    week_start = first_week
+    while week_start <= last_week:
+        if week_monday(week_start) not in recess_weeks:
+            weeks.append(week_start)
+        week_start += timedelta(weeks=1)
+    return weeks
+
+
+class EmptyWeekTracker:
+    """Counts consecutive weeks without classes so scraping can stop once the term has clearly ended.
+
+    Empty weeks before the first week with classes are the break before term, not its end,
+    so they are not counted:
+
+    >>> tracker = EmptyWeekTracker(2)
+    >>> [tracker.add(count) for count in (0, 0, 0, 5, 0, 0)]
+    [False, False, False, False, False, True]
+    """
+
+    def __init__(self, max_empty_weeks: int = DEFAULT_MAX_EMPTY_WEEKS):
+        self.max_empty_weeks = max_empty_weeks
+        self.streak = 0
+        self.seen_classes = False  # Whether any week so far had classes
+
+    def copy(self) -> 'EmptyWeekTracker':
+        tracker = EmptyWeekTracker(self.max_empty_weeks)
+        tracker.streak, tracker.seen_classes = self.streak, self.seen_classes
+        return tracker
+
+    def add(self, event_count: int) -> bool:
+        """Records one week; returns True when it is time to stop."""
+        if event_count:
+            self.seen_classes = True
+            self.streak = 0
+        elif self.seen_classes:
+            self.streak += 1
+        return self.max_empty_weeks > 0 and self.streak >= self.max_empty_weeks